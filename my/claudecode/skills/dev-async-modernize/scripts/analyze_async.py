@@ -5,14 +5,34 @@ Python 异步代码分析器
 """
 
 import ast
+import codecs
+import functools
+import hashlib
+import importlib.metadata
+import importlib.util
+import io
+import linecache
+import os
+import re
+import subprocess
 import sys
+import threading
+import time
+import tokenize
+import urllib.parse
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass, field
-from typing import List, Dict, Set, Optional
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Iterator, List, Dict, Set, Optional, TextIO, Tuple, Union
 import json
 
+# Python 3.10+ 上数据类使用 __slots__，每个问题对象省去一个 __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class AsyncIssue:
     """异步代码问题"""
 
@@ -25,7 +45,7 @@ class AsyncIssue:
     original_code: str = ""
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class AnalysisResult:
     """分析结果"""
 
@@ -34,6 +54,198 @@ class AnalysisResult:
     has_async_code: bool = False
     async_functions: List[str] = field(default_factory=list)
     sync_blocking_calls: List[Dict] = field(default_factory=list)
+    skipped: bool = False  # 被预筛选跳过，未做 AST 分析
+    # 调用图事实：函数限定名 -> {"line", "is_async", "blocking", "calls"}
+    call_graph: Dict[str, Dict] = field(default_factory=dict)
+
+
+class PatternIndex:
+    """多模式子串匹配索引 (Aho-Corasick 自动机)
+
+    first_match(text) 返回满足以下任一条件的最小模式下标：
+    - patterns[i] 是 text 的子串
+    - text 以 suffixes[i] 结尾
+
+    与按字典顺序逐条做 `in` / `endswith` 判断的结果完全一致，
+    但只需沿 text 走一遍自动机，耗时与模式数量无关。
+    """
+
+    _NO_MATCH = sys.maxsize
+
+    def __init__(self, patterns: List[str], suffixes: Optional[List[str]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 每个状态可达（含失败链）的最小子串模式下标 / 最小后缀模式下标
+        self._sub_best: List[int] = [self._NO_MATCH]
+        self._suffix_best: List[int] = [self._NO_MATCH]
+
+        for index, pattern in enumerate(patterns):
+            state = self._insert(pattern)
+            self._sub_best[state] = min(self._sub_best[state], index)
+        for index, suffix in enumerate(suffixes or []):
+            state = self._insert(suffix)
+            self._suffix_best[state] = min(self._suffix_best[state], index)
+
+        self._build_fail_links()
+
+    def _insert(self, pattern: str) -> int:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._sub_best.append(self._NO_MATCH)
+                self._suffix_best.append(self._NO_MATCH)
+            state = nxt
+        return state
+
+    def _build_fail_links(self):
+        """按 BFS 顺序计算失败指针，并沿失败链合并匹配结果"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            # 第一层状态的失败指针指向根节点（空模式）
+            self._sub_best[state] = min(self._sub_best[state], self._sub_best[0])
+            self._suffix_best[state] = min(self._suffix_best[state], self._suffix_best[0])
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                if fail == nxt:
+                    fail = 0
+                self._fail[nxt] = fail
+                self._sub_best[nxt] = min(self._sub_best[nxt], self._sub_best[fail])
+                self._suffix_best[nxt] = min(
+                    self._suffix_best[nxt], self._suffix_best[fail]
+                )
+                queue.append(nxt)
+
+    def first_match(self, text: str) -> Optional[int]:
+        goto, fail, sub_best = self._goto, self._fail, self._sub_best
+        state = 0
+        best = sub_best[0]
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if sub_best[state] < best:
+                best = sub_best[state]
+        best = min(best, self._suffix_best[state])
+        return None if best == self._NO_MATCH else best
+
+
+@dataclass(frozen=True, **_SLOTS)
+class CallInfo:
+    """单个调用名命中的规则，按调用名缓存"""
+
+    blocking: Optional[Dict[str, str]]
+    deprecated: Optional[Dict[str, str]]
+    is_gather: bool
+    is_create_task: bool
+    is_coroutine: bool
+
+
+class CallRuleIndex:
+    """调用名规则的预编译索引
+
+    把 BLOCKING_CALLS / DEPRECATED_APIS / 协程特征词编译成 PatternIndex，
+    并按调用名缓存分类结果。同一个调用名在整个仓库中会反复出现，
+    因此绝大多数 ast.Call 节点只需要一次字典查询。
+    """
+
+    MEMO_LIMIT = 65536
+
+    def __init__(
+        self,
+        blocking_calls: Dict[str, Dict[str, str]],
+        deprecated_apis: Dict[str, Dict[str, str]],
+        coroutine_indicators: List[str],
+    ):
+        self._blocking_exact = dict(blocking_calls)
+        self._blocking_info = list(blocking_calls.values())
+        self._blocking = PatternIndex(
+            list(blocking_calls), [p.split(".")[-1] for p in blocking_calls]
+        )
+        self._deprecated_info = list(deprecated_apis.values())
+        self._deprecated = PatternIndex(list(deprecated_apis))
+        self._coroutine = PatternIndex(coroutine_indicators)
+        self._memo: Dict[str, CallInfo] = {}
+
+    def exact_blocking(self, call_name: str) -> Optional[Dict[str, str]]:
+        """按完整调用名精确查找阻塞调用，用于调用图这类需要低误报的场景"""
+        return self._blocking_exact.get(call_name)
+
+    def classify(self, call_name: str) -> CallInfo:
+        info = self._memo.get(call_name)
+        if info is not None:
+            return info
+
+        blocking = self._blocking.first_match(call_name)
+        deprecated = self._deprecated.first_match(call_name)
+        info = CallInfo(
+            blocking=None if blocking is None else self._blocking_info[blocking],
+            deprecated=None if deprecated is None else self._deprecated_info[deprecated],
+            is_gather="gather" in call_name,
+            is_create_task="create_task" in call_name,
+            is_coroutine=self._coroutine.first_match(call_name.lower()) is not None,
+        )
+
+        if len(self._memo) >= self.MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[call_name] = info
+        return info
+
+
+class SourceLines:
+    """源码行的惰性索引
+
+    只保存一份源码缓冲区 (str，或低内存模式下已校验的 UTF-8 bytes)，第一次取行时才建立
+    行首偏移数组；没有问题需要引用源码的文件不会产生任何额外开销。
+    bytes 缓冲区开头的 UTF-8 BOM 不计入第一行，与默认模式按 utf-8-sig 解码的结果一致。
+    """
+
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self, buffer: Union[str, bytes]):
+        self._buffer = buffer
+        self._offsets: Optional[array] = None
+
+    def _index(self) -> array:
+        if self._offsets is None:
+            start = 0
+            if isinstance(self._buffer, bytes):
+                newline = b"\n"
+                if self._buffer.startswith(codecs.BOM_UTF8):
+                    start = len(codecs.BOM_UTF8)
+            else:
+                newline = "\n"
+            find = self._buffer.find
+            offsets = array("Q", [start])
+            pos = find(newline)
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = find(newline, pos + 1)
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def get(self, line: int) -> str:
+        """返回第 line 行 (从 1 开始) 去除首尾空白后的内容，越界时返回空串"""
+        offsets = self._index()
+        if not 0 < line <= len(offsets):
+            return ""
+        start = offsets[line - 1]
+        end = offsets[line] - 1 if line < len(offsets) else len(self._buffer)
+        text = self._buffer[start:end]
+        if isinstance(text, bytes):
+            text = text.decode("utf-8", errors="replace")
+        return text.strip()
 
 
 class AsyncCodeAnalyzer(ast.NodeVisitor):
@@ -122,21 +334,66 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
         },
     }
 
-    def __init__(self, file_path: str, source: str):
+    # 协程调用特征词（对小写后的调用名做子串匹配）
+    COROUTINE_INDICATORS = [
+        "async",
+        "fetch",
+        "get",
+        "post",
+        "request",
+        "query",
+        "find",
+        "load",
+        "read",
+        "write",
+        "send",
+        "recv",
+        "connect",
+        "close",
+    ]
+
+    def __init__(
+        self,
+        file_path: str,
+        source: Union[str, bytes],
+        rule_set: Optional["RuleSet"] = None,
+        call_graph: bool = False,
+    ):
         self.file_path = file_path
+        rule_set = rule_set or load_rule_set()
+        self.call_rules = rule_set.call_index
+        self.node_rules = rule_set.node_rules
         self.source = source
-        self.lines = source.split("\n")
+        self.source_lines = SourceLines(source)
         self.issues: List[AsyncIssue] = []
         self.async_functions: List[str] = []
         self.current_function: Optional[str] = None
         self.is_async_context: bool = False
         self.imported_names: Dict[str, str] = {}  # 别名映射
+        # 调用图使用的导入映射，相对导入保留前导点以便跨模块解析
+        self.graph_imports: Dict[str, str] = {}
+        self.scope: List[str] = []  # 当前所在的类 / 函数名栈
+        # 只有 --transitive 需要调用图，默认不收集以免拖慢普通分析
+        self.build_call_graph = call_graph
+        self.call_graph: Dict[str, Dict] = {}
+        # 只有启用了节点规则时才改走分发版 visit，没有规则包时遍历开销不变
+        if self.node_rules:
+            self.visit = self._visit_with_rules
+
+    def _visit_with_rules(self, node: ast.AST):
+        """访问节点，先执行规则包中订阅了该节点类型的规则"""
+        rules = self.node_rules.get(type(node))
+        if rules:
+            for rule in rules:
+                rule.check(node, self)
+        return super().visit(node)
 
     def visit_Import(self, node: ast.Import):
         """记录导入"""
         for alias in node.names:
             name = alias.asname if alias.asname else alias.name
             self.imported_names[name] = alias.name
+            self.graph_imports[name] = alias.name
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node: ast.ImportFrom):
@@ -145,13 +402,22 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
         for alias in node.names:
             name = alias.asname if alias.asname else alias.name
             self.imported_names[name] = f"{module}.{alias.name}"
+            prefix = "." * (node.level or 0) + (f"{module}." if module else "")
+            self.graph_imports[name] = f"{prefix}{alias.name}"
         self.generic_visit(node)
 
+    def visit_ClassDef(self, node: ast.ClassDef):
+        """记录类作用域，方法在调用图中以 Class.method 命名"""
+        self.scope.append(node.name)
+        self.generic_visit(node)
+        self.scope.pop()
+
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
         """访问异步函数定义"""
         self.current_function = node.name
         self.async_functions.append(node.name)
         self.is_async_context = True
+        self._enter_graph_function(node, is_async=True)
 
         # 检查函数是否为空或只有 pass
         if len(node.body) == 1 and isinstance(node.body[0], ast.Pass):
@@ -164,6 +430,7 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
             )
 
         self.generic_visit(node)
+        self.scope.pop()
         self.is_async_context = False
         self.current_function = None
 
@@ -173,9 +440,11 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
         prev_async = self.is_async_context
         self.current_function = node.name
         self.is_async_context = False
+        self._enter_graph_function(node, is_async=False)
 
         # 检查函数是否返回协程但未标记为 async
         self.generic_visit(node)
+        self.scope.pop()
 
         self.current_function = prev_function
         self.is_async_context = prev_async
@@ -183,24 +452,28 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
     def visit_Call(self, node: ast.Call):
         """检测函数调用"""
         call_name = self._get_call_name(node)
+        self._record_graph_call(node, call_name)
 
         if not call_name:
             self.generic_visit(node)
             return
 
+        info = self.call_rules.classify(call_name)
+
         # 检查是否在异步函数中使用了阻塞调用
-        if self.is_async_context:
+        if self.is_async_context and info.blocking is not None:
             self._check_blocking_call(node, call_name)
 
         # 检查过时的 asyncio API
-        self._check_deprecated_api(node, call_name)
+        if info.deprecated is not None:
+            self._check_deprecated_api(node, call_name)
 
         # 检查 gather 的使用问题
-        if "gather" in call_name:
+        if info.is_gather:
             self._check_gather_usage(node)
 
         # 检查 create_task 问题
-        if "create_task" in call_name:
+        if info.is_create_task:
             self._check_create_task_usage(node)
 
         self.generic_visit(node)
@@ -210,8 +483,8 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
         # 检查 await 是否用于非协程
         if isinstance(node.value, ast.Call):
             call_name = self._get_call_name(node.value)
-            if call_name and call_name in self.BLOCKING_CALLS:
-                info = self.BLOCKING_CALLS[call_name]
+            info = self.call_rules.exact_blocking(call_name) if call_name else None
+            if info is not None:
                 self._add_issue(
                     node.lineno,
                     "awaiting_blocking_call",
@@ -264,11 +537,45 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
                 )
         self.generic_visit(node)
 
-    def _get_call_name(self, node: ast.Call) -> Optional[str]:
+    def _enter_graph_function(self, node: ast.AST, is_async: bool):
+        """进入函数作用域，在调用图中登记该函数"""
+        self.scope.append(node.name)
+        if not self.build_call_graph:
+            return
+        self.call_graph.setdefault(
+            ".".join(self.scope),
+            {"line": node.lineno, "is_async": is_async, "blocking": None, "calls": []},
+        )
+
+    def _record_graph_call(self, node: ast.Call, call_name: Optional[str]):
+        """记录函数内的调用：精确命中阻塞调用表的记为 blocking，其余记为被调函数"""
+        if not self.build_call_graph or not self.scope or not call_name:
+            return
+        facts = self.call_graph.get(".".join(self.scope))
+        if facts is None:  # 类体中的调用
+            return
+
+        if self.call_rules.exact_blocking(call_name) is not None:
+            if facts["blocking"] is None:
+                facts["blocking"] = [call_name, node.lineno]
+            return
+
+        callee = self._get_call_name(node, self.graph_imports)
+        head, _, rest = callee.partition(".")
+        if head in ("self", "cls") and rest and len(self.scope) > 1:
+            # 方法内的 self.x() 解析为同一个类的 Class.x
+            callee = ".".join(self.scope[:-1] + [rest])
+        facts["calls"].append([callee, node.lineno])
+
+    def _get_call_name(
+        self, node: ast.Call, imports: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
         """获取函数调用的完整名称"""
+        if imports is None:
+            imports = self.imported_names
         if isinstance(node.func, ast.Name):
             name = node.func.id
-            return self.imported_names.get(name, name)
+            return imports.get(name, name)
         elif isinstance(node.func, ast.Attribute):
             parts = []
             current = node.func
@@ -280,57 +587,39 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
                 full_name = ".".join(reversed(parts))
                 # 检查是否有别名
                 base = parts[-1]
-                if base in self.imported_names:
-                    return self.imported_names[base] + "." + ".".join(parts[:-1])
+                if base in imports:
+                    return imports[base] + "." + ".".join(reversed(parts[:-1]))
                 return full_name
         return None
 
     def _is_coroutine_call(self, call_name: str) -> bool:
         """判断调用是否是协程"""
-        coroutine_indicators = [
-            "async",
-            "fetch",
-            "get",
-            "post",
-            "request",
-            "query",
-            "find",
-            "load",
-            "read",
-            "write",
-            "send",
-            "recv",
-            "connect",
-            "close",
-        ]
-        return any(ind in call_name.lower() for ind in coroutine_indicators)
+        return self.call_rules.classify(call_name).is_coroutine
 
     def _check_blocking_call(self, node: ast.Call, call_name: str):
         """检查阻塞调用"""
-        for pattern, info in self.BLOCKING_CALLS.items():
-            if pattern in call_name or call_name.endswith(pattern.split(".")[-1]):
-                self._add_issue(
-                    node.lineno,
-                    "blocking_call_in_async",
-                    "critical",
-                    f"在异步函数中使用了阻塞调用 '{call_name}'",
-                    f"使用 {info['replacement']} 替代",
-                    self._get_source_line(node.lineno),
-                )
-                return
+        info = self.call_rules.classify(call_name).blocking
+        if info is not None:
+            self._add_issue(
+                node.lineno,
+                "blocking_call_in_async",
+                "critical",
+                f"在异步函数中使用了阻塞调用 '{call_name}'",
+                f"使用 {info['replacement']} 替代",
+                self._get_source_line(node.lineno),
+            )
 
     def _check_deprecated_api(self, node: ast.Call, call_name: str):
         """检查过时的 API"""
-        for pattern, info in self.DEPRECATED_APIS.items():
-            if pattern in call_name:
-                self._add_issue(
-                    node.lineno,
-                    "deprecated_asyncio_api",
-                    "warning",
-                    f"使用了过时的 API '{call_name}'",
-                    f"{info['reason']}，使用 {info['replacement']} 替代",
-                )
-                return
+        info = self.call_rules.classify(call_name).deprecated
+        if info is not None:
+            self._add_issue(
+                node.lineno,
+                "deprecated_asyncio_api",
+                "warning",
+                f"使用了过时的 API '{call_name}'",
+                f"{info['reason']}，使用 {info['replacement']} 替代",
+            )
 
     def _check_gather_usage(self, node: ast.Call):
         """检查 gather 的使用"""
@@ -376,8 +665,8 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
         original_code: str = "",
     ):
         """添加问题"""
-        if not original_code and line > 0 and line <= len(self.lines):
-            original_code = self.lines[line - 1].strip()
+        if not original_code:
+            original_code = self.source_lines.get(line)
 
         self.issues.append(
             AsyncIssue(
@@ -393,30 +682,319 @@ class AsyncCodeAnalyzer(ast.NodeVisitor):
 
     def _get_source_line(self, line: int) -> str:
         """获取源代码行"""
-        if 0 < line <= len(self.lines):
-            return self.lines[line - 1].strip()
-        return ""
+        return self.source_lines.get(line)
+
+    @property
+    def lines(self) -> List[str]:
+        """全部源代码行（按需生成，仅为兼容保留）"""
+        source = self.source
+        if isinstance(source, bytes):
+            source = source.decode("utf-8", errors="replace")
+        return source.split("\n")
 
+    # 以下为规则包可使用的公开接口
 
-def analyze_file(file_path: Path) -> AnalysisResult:
-    """分析单个 Python 文件"""
-    result = AnalysisResult(file_path=str(file_path))
+    def get_call_name(self, node: ast.Call) -> Optional[str]:
+        """获取调用的完整名称（已展开导入别名）"""
+        return self._get_call_name(node)
+
+    def add_issue(
+        self,
+        line: int,
+        issue_type: str,
+        severity: str,
+        message: str,
+        suggestion: str,
+        original_code: str = "",
+    ):
+        """报告一个问题，未提供 original_code 时自动取源代码行"""
+        self._add_issue(line, issue_type, severity, message, suggestion, original_code)
+
+
+# 规则集版本号：修改检测逻辑或输出内容时递增，使旧缓存失效
+RULESET_VERSION = "2"
+
+# 通过 entry point 注册规则包时使用的分组名
+RULE_PACK_ENTRY_POINT_GROUP = "analyze_async.rules"
+
+
+@dataclass(frozen=True)
+class RuleSelection:
+    """启用的规则包选择，可序列化后传给子进程再加载"""
+
+    packs: Tuple[str, ...] = ()
+    rules_dirs: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class RulePackSource:
+    """已发现但尚未加载的规则包"""
+
+    name: str
+    origin: str  # 规则目录中的文件路径，或 entry point 的 "module:attr"
+    entry_point: Optional[object] = None
+
+    def load(self):
+        """导入规则包模块（仅在规则包被启用时调用）"""
+        if self.entry_point is not None:
+            return self.entry_point.load()
+        spec = importlib.util.spec_from_file_location(
+            f"analyze_async_rules.{self.name}", self.origin
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def version_token(self) -> str:
+        """规则包内容标识，用于缓存键；规则包修改后缓存自动失效"""
+        if self.entry_point is not None:
+            dist = getattr(self.entry_point, "dist", None)
+            version = getattr(dist, "version", "") if dist else ""
+            return f"{self.origin}@{version}"
+        digest = hashlib.sha256(Path(self.origin).read_bytes()).hexdigest()
+        return f"{self.name}@{digest}"
+
+
+class RuleLoadError(RuntimeError):
+    """规则包不存在或格式不正确"""
+
+
+def discover_rule_packs(rules_dirs: Iterable[str] = ()) -> Dict[str, RulePackSource]:
+    """发现可用的规则包，只记录位置，不导入模块
+
+    规则包来源：
+    - 规则目录中的 *.py 文件（文件名即规则包名，以下划线开头的文件忽略）
+    - 以 "analyze_async.rules" 分组注册的 entry point
+    同名时规则目录优先。
+    """
+    sources: Dict[str, RulePackSource] = {}
 
     try:
-        source = file_path.read_text(encoding="utf-8")
-        tree = ast.parse(source)
+        entry_points = importlib.metadata.entry_points(
+            group=RULE_PACK_ENTRY_POINT_GROUP
+        )
+    except Exception:
+        entry_points = []
+    for ep in entry_points:
+        sources[ep.name] = RulePackSource(ep.name, ep.value, entry_point=ep)
+
+    for rules_dir in rules_dirs:
+        for path in sorted(Path(rules_dir).glob("*.py")):
+            if path.name.startswith("_"):
+                continue
+            sources[path.stem] = RulePackSource(path.stem, str(path))
+
+    return sources
+
+
+class RuleSet:
+    """内置规则与启用的规则包合并后的规则集
+
+    - 规则包中的 BLOCKING_CALLS / DEPRECATED_APIS 追加到内置规则表之后，
+      编译进同一个 CallRuleIndex
+    - 规则包中的 RULES 按订阅的 AST 节点类型分组，
+      在 AsyncCodeAnalyzer 的同一次遍历中分发
+    - prefilter 是预筛选用的字节正则：文件中不包含任何关键字时，
+      启用的规则都不可能命中 (同步代码中 bare_coroutine_call 的启发式结果除外)，
+      可以跳过 AST 分析
+    """
+
+    # 内置规则依赖的关键字：异步上下文规则需要 async，gather 检查需要 gather。
+    # bare_coroutine_call 的协程特征词 (get、read、close 等) 几乎出现在所有文件中，
+    # 加入后预筛选形同虚设，因此不含 async / await 的同步文件直接跳过，
+    # 放弃其中的启发式结果
+    PREFILTER_TOKENS = (b"async", b"await", b"gather")
+
+    def __init__(self, packs: Iterable[Tuple[RulePackSource, object]] = ()):
+        blocking_calls = dict(AsyncCodeAnalyzer.BLOCKING_CALLS)
+        deprecated_apis = dict(AsyncCodeAnalyzer.DEPRECATED_APIS)
+        self.node_rules: Dict[type, List[object]] = {}
+        self.pack_names: List[str] = []
+        tokens = []
+        prefilter_tokens = set(self.PREFILTER_TOKENS)
+        can_prefilter = True
+
+        for source, module in packs:
+            blocking_calls.update(getattr(module, "BLOCKING_CALLS", {}))
+            deprecated_apis.update(getattr(module, "DEPRECATED_APIS", {}))
+            for rule in getattr(module, "RULES", []):
+                node_types = getattr(rule, "node_types", None)
+                if not node_types or not callable(getattr(rule, "check", None)):
+                    raise RuleLoadError(
+                        f"规则包 '{source.name}' 中的规则 {rule!r} 缺少 node_types 或 check()"
+                    )
+                for node_type in node_types:
+                    self.node_rules.setdefault(node_type, []).append(rule)
+            # 带自定义节点规则的规则包需要声明 PREFILTER_TOKENS，否则无法安全跳过文件
+            pack_tokens = getattr(module, "PREFILTER_TOKENS", None)
+            if pack_tokens is not None:
+                prefilter_tokens.update(
+                    t.encode("utf-8") if isinstance(t, str) else t for t in pack_tokens
+                )
+            elif getattr(module, "RULES", None):
+                can_prefilter = False
+            self.pack_names.append(source.name)
+            tokens.append(source.version_token())
+
+        self.call_index = CallRuleIndex(
+            blocking_calls, deprecated_apis, AsyncCodeAnalyzer.COROUTINE_INDICATORS
+        )
+
+        # 过时 API 在任意上下文都会检查；调用名的每一段都来自源码文本，
+        # 因此模式的第一段一定会以原文出现在文件中
+        for pattern in deprecated_apis:
+            prefilter_tokens.add(pattern.split(".")[0].encode("utf-8"))
+        self.prefilter: Optional[re.Pattern] = None
+        if can_prefilter:
+            self.prefilter = re.compile(
+                b"|".join(re.escape(t) for t in sorted(prefilter_tokens) if t)
+            )
 
-        analyzer = AsyncCodeAnalyzer(str(file_path), source)
+        payload = json.dumps(
+            {
+                "version": RULESET_VERSION,
+                "blocking_calls": blocking_calls,
+                "deprecated_apis": deprecated_apis,
+                "coroutine_indicators": AsyncCodeAnalyzer.COROUTINE_INDICATORS,
+                "packs": tokens,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        self.fingerprint = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+# 每个进程中按 RuleSelection 缓存已加载的规则集
+_RULE_SETS: Dict[RuleSelection, RuleSet] = {}
+
+
+def load_rule_set(selection: Optional[RuleSelection] = None) -> RuleSet:
+    """加载规则集，只导入被启用的规则包，同一进程内只加载一次"""
+    selection = selection or RuleSelection()
+    rule_set = _RULE_SETS.get(selection)
+    if rule_set is not None:
+        return rule_set
+
+    packs = []
+    if selection.packs:
+        sources = discover_rule_packs(selection.rules_dirs)
+        for name in selection.packs:
+            if name not in sources:
+                raise RuleLoadError(f"未找到规则包 '{name}'")
+            try:
+                module = sources[name].load()
+            except Exception as e:
+                raise RuleLoadError(f"加载规则包 '{name}' 失败: {e}") from e
+            packs.append((sources[name], module))
+
+    rule_set = RuleSet(packs)
+    _RULE_SETS[selection] = rule_set
+    return rule_set
+
+
+# 低内存模式下超过该大小的文件按顶层语句分块解析
+LOW_MEMORY_CHUNK_SIZE = 64 * 1024
+
+# 以这些关键字开头的顶层行属于上一条复合语句，不能作为分块边界
+_CONTINUATION_KEYWORDS = ("else", "elif", "except", "finally")
+
+
+def _iter_top_level_chunks(
+    source: Union[str, bytes], chunk_size: int
+) -> Iterator[Tuple[int, Union[str, bytes]]]:
+    """按顶层语句把源码切成约 chunk_size 大小的块，产出 (起始行偏移, 块)
+
+    边界取自第 0 列开始的代码行，跳过缩进、注释、右括号、复合语句的
+    后续子句以及紧跟在装饰器后的行。多行字符串等情况可能切错，
+    但切错的块必然无法单独解析，由调用方回退到整文件解析。
+    """
+    is_bytes = isinstance(source, bytes)
+    newline = b"\n" if is_bytes else "\n"
+    skip = tuple(b" \t#\r\n)]}") if is_bytes else tuple(" \t#\r\n)]}")
+    keywords = tuple(
+        k.encode() if is_bytes else k for k in _CONTINUATION_KEYWORDS
+    )
+    decorator = b"@"[0] if is_bytes else "@"
+
+    chunk_start = 0
+    chunk_line = 0
+    line_no = 0
+    pos = 0
+    after_decorator = False
+    length = len(source)
+    while pos < length:
+        end = source.find(newline, pos)
+        end = length if end == -1 else end + 1
+        first = source[pos]
+        if first not in skip:
+            is_boundary = (
+                not after_decorator
+                and pos - chunk_start >= chunk_size
+                and not source.startswith(keywords, pos)
+            )
+            if is_boundary:
+                yield chunk_line, source[chunk_start:pos]
+                chunk_start, chunk_line = pos, line_no
+            after_decorator = first == decorator
+        pos = end
+        line_no += 1
+    if chunk_start < length:
+        yield chunk_line, source[chunk_start:]
+
+
+def _visit_in_chunks(
+    analyzer: AsyncCodeAnalyzer, source: Union[str, bytes], chunk_size: int
+):
+    """逐块解析并遍历，每块的 AST 遍历完即释放，峰值内存只取决于最大的块"""
+    for offset, chunk in _iter_top_level_chunks(source, chunk_size):
+        tree = ast.parse(chunk)
+        if offset:
+            ast.increment_lineno(tree, offset)
         analyzer.visit(tree)
+        del tree, chunk
+
+
+def analyze_source(
+    file_path: str,
+    source: Union[str, bytes],
+    rule_set: Optional[RuleSet] = None,
+    chunk_size: Optional[int] = None,
+    call_graph: bool = False,
+) -> AnalysisResult:
+    """分析一段已读取的 Python 源码 (str，或低内存模式下的原始 bytes)
+
+    指定 chunk_size 且源码更大时按顶层语句分块解析；
+    任一块无法单独解析时回退为整文件解析。
+    call_graph 为 True 时同时收集 --transitive 所需的调用图。
+    """
+    result = AnalysisResult(file_path=file_path)
+
+    try:
+        analyzer = None
+        if chunk_size and len(source) > chunk_size:
+            analyzer = AsyncCodeAnalyzer(file_path, source, rule_set, call_graph)
+            try:
+                _visit_in_chunks(analyzer, source, chunk_size)
+            except SyntaxError:
+                analyzer = None
+
+        if analyzer is None:
+            tree = ast.parse(source)
+
+            analyzer = AsyncCodeAnalyzer(file_path, source, rule_set, call_graph)
+            analyzer.visit(tree)
+            # 遍历结束立即释放 AST，大文件的 AST 通常是源码体积的数十倍
+            del tree
 
         result.issues = analyzer.issues
         result.async_functions = analyzer.async_functions
+        result.call_graph = analyzer.call_graph
         result.has_async_code = len(analyzer.async_functions) > 0
 
     except SyntaxError as e:
         result.issues.append(
             AsyncIssue(
-                file_path=str(file_path),
+                file_path=file_path,
                 line_number=e.lineno or 0,
                 issue_type="syntax_error",
                 severity="critical",
@@ -427,7 +1005,7 @@ def analyze_file(file_path: Path) -> AnalysisResult:
     except Exception as e:
         result.issues.append(
             AsyncIssue(
-                file_path=str(file_path),
+                file_path=file_path,
                 line_number=0,
                 issue_type="analysis_error",
                 severity="warning",
@@ -439,136 +1017,1329 @@ def analyze_file(file_path: Path) -> AnalysisResult:
     return result
 
 
-def analyze_directory(
+def _read_error_result(file_path: Path, error: Exception) -> AnalysisResult:
+    """文件无法读取时的分析结果"""
+    return AnalysisResult(
+        file_path=str(file_path),
+        issues=[
+            AsyncIssue(
+                file_path=str(file_path),
+                line_number=0,
+                issue_type="analysis_error",
+                severity="warning",
+                message=f"分析失败: {error}",
+                suggestion="检查文件是否可访问",
+            )
+        ],
+    )
+
+
+def _source_encoding(content: bytes) -> str:
+    """按 BOM 和 PEP 263 编码声明确定源码编码，与 ast.parse 解析 bytes 时的规则一致"""
+    return tokenize.detect_encoding(io.BytesIO(content).readline)[0]
+
+
+def _decode_source(content: bytes, encoding: str = "utf-8") -> str:
+    """按源码编码解码并统一换行符"""
+    return content.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
+
+
+_LONE_CR = re.compile(rb"\r(?!\n)")
+
+# 低内存模式校验 UTF-8 时每次解码的字节数
+_UTF8_CHECK_BLOCK = 1024 * 1024
+
+
+def _check_utf8(content: bytes):
+    """分块校验 UTF-8，不生成完整的 str 副本
+
+    非法字节时整体解码一次，抛出与默认模式完全相同的 UnicodeDecodeError。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    view = memoryview(content)
+    try:
+        for start in range(0, len(content), _UTF8_CHECK_BLOCK):
+            decoder.decode(view[start : start + _UTF8_CHECK_BLOCK])
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        content.decode("utf-8")
+        raise
+
+
+def _prepare_source(content: bytes, low_memory: bool) -> Union[str, bytes]:
+    """准备交给 ast.parse 的源码
+
+    两种模式都先按 BOM / 编码声明确定编码，保证结果一致。
+    低内存模式对 UTF-8 文件直接解析原始 bytes，不再生成解码后的 str 副本；
+    分块解析时只有第一块带有编码声明，因此其他编码的文件，
+    以及含有单独 \\r 换行 (行号与按 \\n 切分不一致) 的文件仍走解码路径。
+    """
+    encoding = _source_encoding(content)
+    if (
+        low_memory
+        and encoding in ("utf-8", "utf-8-sig")
+        and not _LONE_CR.search(content)
+    ):
+        _check_utf8(content)
+        return content
+    return _decode_source(content, encoding)
+
+
+def needs_analysis(content: bytes, rule_set: RuleSet) -> bool:
+    """预筛选：文件中不含启用规则依赖的任何关键字时返回 False"""
+    return rule_set.prefilter is None or rule_set.prefilter.search(content) is not None
+
+
+def analyze_file(
+    file_path: Path,
+    rules: Optional[RuleSelection] = None,
+    prefilter: bool = False,
+    low_memory: bool = False,
+    call_graph: bool = False,
+) -> AnalysisResult:
+    """分析单个 Python 文件
+
+    prefilter 为 True 时先对原始字节做关键字搜索，
+    不可能命中任何规则的文件直接跳过解析。
+    low_memory 为 True 时直接解析原始字节，分析期间只保留一份源码缓冲区，
+    大文件按顶层语句分块解析。
+    """
+    rule_set = load_rule_set(rules)
+    try:
+        content = file_path.read_bytes()
+        if prefilter and not needs_analysis(content, rule_set):
+            return AnalysisResult(file_path=str(file_path), skipped=True)
+        source = _prepare_source(content, low_memory)
+    except Exception as e:
+        return _read_error_result(file_path, e)
+    del content  # 解码后不再需要原始字节
+    chunk_size = LOW_MEMORY_CHUNK_SIZE if low_memory else None
+    return analyze_source(str(file_path), source, rule_set, chunk_size, call_graph)
+
+
+@dataclass
+class CacheStats:
+    """缓存统计"""
+
+    hits: int = 0
+    misses: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    evicted: int = 0
+    size_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class CachedOutcome:
+    """子进程返回给主进程的单文件结果和缓存信息"""
+
+    result: AnalysisResult
+    hit: bool
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+
+class AnalysisCache:
+    """基于文件内容哈希的磁盘缓存
+
+    缓存键 = 文件内容 SHA-256 + 规则集指纹 + Python 解释器版本，
+    每个条目是一个 JSON 文件，保存序列化后的 AsyncIssue 列表。
+    条目命中时刷新 mtime，prune() 按 mtime 做 LRU 淘汰，
+    保证缓存目录大小不超过 max_bytes。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        rules: Optional[RuleSelection] = None,
+        prefilter: bool = False,
+        low_memory: bool = False,
+        call_graph: bool = False,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.rules = rules or RuleSelection()
+        self.prefilter = prefilter
+        self.low_memory = low_memory
+        self.call_graph = call_graph
+        self.stats = CacheStats()
+        # 规则集和解释器版本对一次运行是固定的，只需计算一次；
+        # 不带调用图的条目不能用于 --transitive，因此单独分区；
+        # 两种解析模式的结果也分开存放，避免一种模式的缺陷被另一种模式读到
+        fingerprint = load_rule_set(self.rules).fingerprint
+        graph = "cg" if call_graph else "nocg"
+        mode = "lowmem" if low_memory else "default"
+        self.namespace = (
+            f"{fingerprint}-{graph}-{mode}-{sys.implementation.cache_tag}"
+        )
+
+    def key_for(self, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        return f"{self.namespace}-{digest}"
+
+    def _entry_path(self, key: str) -> Path:
+        digest = key.rsplit("-", 1)[-1]
+        return self.cache_dir / digest[:2] / f"{key}.json"
+
+    def analyze(self, file_path: Path) -> CachedOutcome:
+        """带缓存地分析单个文件，可在子进程中调用"""
+        rule_set = load_rule_set(self.rules)
+        try:
+            content = file_path.read_bytes()
+        except Exception as e:
+            return CachedOutcome(_read_error_result(file_path, e), hit=False)
+
+        # 预筛选比哈希和缓存查找更便宜，先执行
+        if self.prefilter and not needs_analysis(content, rule_set):
+            result = AnalysisResult(file_path=str(file_path), skipped=True)
+            return CachedOutcome(result, hit=False)
+
+        entry = self._entry_path(self.key_for(content))
+        try:
+            raw = entry.read_bytes()
+            result = _result_from_cache(str(file_path), json.loads(raw))
+            os.utime(entry)  # 刷新 LRU 时间戳
+            return CachedOutcome(result, hit=True, bytes_read=len(raw))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        try:
+            source = _prepare_source(content, self.low_memory)
+        except (SyntaxError, ValueError) as e:  # 未知编码声明 / 解码失败
+            return CachedOutcome(_read_error_result(file_path, e), hit=False)
+        if source is not content:
+            del content
+
+        chunk_size = LOW_MEMORY_CHUNK_SIZE if self.low_memory else None
+        result = analyze_source(
+            str(file_path), source, rule_set, chunk_size, self.call_graph
+        )
+        written = _write_atomic(entry, _result_to_cache(result))
+        return CachedOutcome(result, hit=False, bytes_written=written)
+
+    def record(self, outcome: CachedOutcome):
+        """在主进程中汇总单个文件的缓存统计"""
+        if outcome.result.skipped:
+            return
+        if outcome.hit:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+        self.stats.bytes_read += outcome.bytes_read
+        self.stats.bytes_written += outcome.bytes_written
+
+    def prune(self):
+        """按最近使用时间淘汰条目，直到总大小不超过 max_bytes"""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*/*.json"):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats.evicted += 1
+
+        self.stats.size_bytes = total
+
+
+def _result_to_cache(result: AnalysisResult) -> bytes:
+    """序列化分析结果，不保存文件路径以便相同内容的文件共享条目"""
+    issues = []
+    for issue in result.issues:
+        data = asdict(issue)
+        del data["file_path"]
+        issues.append(data)
+    payload = {
+        "issues": issues,
+        "has_async_code": result.has_async_code,
+        "async_functions": result.async_functions,
+        "call_graph": result.call_graph,
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _result_from_cache(file_path: str, data: Dict) -> AnalysisResult:
+    """从缓存条目还原分析结果"""
+    return AnalysisResult(
+        file_path=file_path,
+        issues=[AsyncIssue(file_path=file_path, **issue) for issue in data["issues"]],
+        has_async_code=data["has_async_code"],
+        async_functions=data["async_functions"],
+        call_graph=data["call_graph"],
+    )
+
+
+def _write_atomic(path: Path, data: bytes) -> int:
+    """原子写入缓存条目，多进程并发写同一条目也不会产生半截文件"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        return 0
+    return len(data)
+
+
+DEFAULT_EXCLUDE_PATTERNS = [
+    "venv",
+    ".venv",
+    "__pycache__",
+    ".git",
+    ".tox",
+    ".pytest_cache",
+    "node_modules",
+]
+
+
+def iter_python_files(
     directory: Path, exclude_patterns: List[str] = None
-) -> List[AnalysisResult]:
-    """分析整个目录"""
-    exclude_patterns = exclude_patterns or [
-        "venv",
-        ".venv",
-        "__pycache__",
-        ".git",
-        ".tox",
-        ".pytest_cache",
-        "node_modules",
-    ]
-    results = []
+) -> Iterator[Path]:
+    """按 rglob 顺序枚举目录下需要分析的 Python 文件"""
+    exclude_patterns = exclude_patterns or DEFAULT_EXCLUDE_PATTERNS
 
     for py_file in directory.rglob("*.py"):
         # 检查是否应该排除
         if any(pattern in str(py_file) for pattern in exclude_patterns):
             continue
+        yield py_file
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """解析并行进程数，0 或 None 表示使用全部 CPU 核心"""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def iter_analyze_files(
+    files: Iterable[Path],
+    jobs: int = 1,
+    chunksize: int = 16,
+    cache: Optional[AnalysisCache] = None,
+    rules: Optional[RuleSelection] = None,
+    prefilter: bool = False,
+    low_memory: bool = False,
+    call_graph: bool = False,
+) -> Iterator[AnalysisResult]:
+    """逐个产出分析结果，顺序与输入文件顺序一致
+
+    jobs > 1 时使用进程池并行解析，结果按提交顺序流式返回，
+    因此报告内容与串行运行完全一致。传入 cache 时命中的文件跳过解析，
+    此时使用 cache 上记录的规则包选择、预筛选、低内存和调用图设置。
+    """
+    if cache is None:
+        worker = functools.partial(
+            analyze_file,
+            rules=rules,
+            prefilter=prefilter,
+            low_memory=low_memory,
+            call_graph=call_graph,
+        )
+    else:
+        worker = cache.analyze
+
+    if jobs <= 1:
+        yield from _collect_outcomes(map(worker, files), cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # map 按输入顺序产出结果，chunksize 用于摊薄进程间通信开销
+        outputs = executor.map(worker, files, chunksize=chunksize)
+        yield from _collect_outcomes(outputs, cache)
+
 
-        result = analyze_file(py_file)
-        results.append(result)
+def _collect_outcomes(outputs: Iterable, cache: Optional[AnalysisCache]):
+    """启用缓存时在主进程汇总统计并取出分析结果"""
+    if cache is None:
+        yield from outputs
+        return
+    for outcome in outputs:
+        cache.record(outcome)
+        yield outcome.result
 
-    return results
 
+def analyze_directory(
+    directory: Path,
+    exclude_patterns: List[str] = None,
+    jobs: int = 1,
+    cache: Optional[AnalysisCache] = None,
+    rules: Optional[RuleSelection] = None,
+    prefilter: bool = False,
+    low_memory: bool = False,
+    call_graph: bool = False,
+) -> List[AnalysisResult]:
+    """分析整个目录"""
+    files = list(iter_python_files(directory, exclude_patterns))
+    results = iter_analyze_files(
+        files,
+        jobs,
+        cache=cache,
+        rules=rules,
+        prefilter=prefilter,
+        low_memory=low_memory,
+        call_graph=call_graph,
+    )
+    return list(results)
 
-def generate_report(results: List[AnalysisResult], output_format: str = "json") -> str:
+
+class CallGraph:
+    """项目级调用图，用于检测异步函数经由同步辅助函数间接触达的阻塞调用
+
+    节点是各文件 call_graph 中登记的函数，以 "模块名.限定名" 索引；
+    被调函数名通过导入映射 (含相对导入)、同模块函数和 self./cls. 方法解析。
+    每个同步函数的可达性只计算一次并缓存 (记录下一跳)，总体近似线性。
+    """
+
+    def __init__(self, results: Iterable[AnalysisResult], root: Path):
+        self.root = root
+        # 限定名 -> (所属结果, 模块名, 包名, 函数事实)
+        self.functions: Dict[str, Tuple[AnalysisResult, str, str, Dict]] = {}
+        # 可用于解析的名称 -> 限定名
+        self._aliases: Dict[str, str] = {}
+        self._memo: Dict[str, object] = {}
+
+        for result in results:
+            if not result.call_graph:
+                continue
+            module, package = self._module_name(Path(result.file_path))
+            parts = module.split(".")
+            for local, facts in result.call_graph.items():
+                qualname = f"{module}.{local}"
+                if qualname in self.functions:
+                    continue
+                self.functions[qualname] = (result, module, package, facts)
+                self._aliases.setdefault(qualname, qualname)
+                # 同时登记去掉前缀的模块名，兼容 src/ 布局等导入根不是扫描根的情况
+                for i in range(1, len(parts)):
+                    self._aliases.setdefault(".".join(parts[i:] + [local]), qualname)
+
+    def _module_name(self, path: Path) -> Tuple[str, str]:
+        """根据相对扫描根的路径推导 (模块名, 包名)"""
+        try:
+            parts = list(path.resolve().relative_to(self.root.resolve()).with_suffix("").parts)
+        except ValueError:
+            parts = [path.stem]
+        if parts and parts[-1] == "__init__":
+            parts.pop()
+            package = parts
+        else:
+            package = parts[:-1]
+        return ".".join(parts) or path.stem, ".".join(package)
+
+    def _resolve(self, caller: str, callee: str) -> Optional[str]:
+        """把调用点记录的名称解析为调用图中的函数限定名"""
+        _, module, package, _ = self.functions[caller]
+        if callee.startswith("."):
+            level = len(callee) - len(callee.lstrip("."))
+            base = package.split(".") if package else []
+            if level > 1:
+                base = base[: len(base) - (level - 1)]
+            return self._aliases.get(".".join(base + [callee.lstrip(".")]))
+
+        # 由内向外依次尝试调用方的作用域（嵌套函数 / 方法）、同模块、绝对导入名
+        scope = caller[len(module) + 1 :].split(".")
+        while scope:
+            target = self._aliases.get(".".join([module, *scope, callee]))
+            if target is not None:
+                return target
+            scope.pop()
+        return self._aliases.get(f"{module}.{callee}") or self._aliases.get(callee)
+
+    def _sync_callees(self, qualname: str) -> Iterator[str]:
+        for callee, _ in self.functions[qualname][3]["calls"]:
+            target = self._resolve(qualname, callee)
+            if target is not None and not self.functions[target][3]["is_async"]:
+                yield target
+
+    def blocking_path(self, qualname: str) -> Optional[Tuple[List[str], str]]:
+        """返回同步函数到阻塞调用的路径 ([函数, ...], 阻塞调用名)，不可达时返回 None"""
+        memo = self._memo
+        if qualname not in memo:
+            self._explore(qualname)
+        if memo[qualname] is None:
+            return None
+
+        path = [qualname]
+        next_hop, blocking = memo[qualname]
+        while next_hop is not None:
+            path.append(next_hop)
+            next_hop, blocking = memo[next_hop]
+        return path, blocking
+
+    def _explore(self, start: str):
+        """迭代式 Tarjan 强连通分量算法，为每个函数记录 (下一跳, 阻塞调用名) 或 None
+
+        相互递归的函数属于同一个强连通分量，要等整个分量出栈、
+        分量外的被调函数全部求解后才一起求解，
+        因此不会因为遇到仍在搜索中的函数而缓存错误的否定结果。
+        """
+        memo = self._memo
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        callees: Dict[str, List[str]] = {}
+        component_stack: List[str] = []
+        on_stack: Set[str] = set()
+        work: List[Tuple[str, Iterator[str]]] = []
+
+        def enter(fn: str) -> bool:
+            blocking = self.functions[fn][3]["blocking"]
+            if blocking is not None:
+                memo[fn] = (None, blocking[0])
+                return False
+            index[fn] = lowlink[fn] = len(index)
+            callees[fn] = list(self._sync_callees(fn))
+            component_stack.append(fn)
+            on_stack.add(fn)
+            work.append((fn, iter(callees[fn])))
+            return True
+
+        enter(start)
+        while work:
+            fn, pending = work[-1]
+            for callee in pending:
+                if callee in memo:  # 已求解，或自身就是阻塞调用
+                    continue
+                if callee in on_stack:
+                    lowlink[fn] = min(lowlink[fn], index[callee])
+                    continue
+                if enter(callee):
+                    break
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[fn])
+                if lowlink[fn] == index[fn]:
+                    component = []
+                    while True:
+                        member = component_stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == fn:
+                            break
+                    self._solve_component(component, callees)
+
+    def _solve_component(self, component: List[str], callees: Dict[str, List[str]]):
+        """求解一个强连通分量：分量外的被调函数均已求解，可达性在分量内反向传播"""
+        memo = self._memo
+        members = set(component)
+        callers: Dict[str, List[str]] = {fn: [] for fn in component}
+        reached = deque()
+
+        for fn in component:
+            for callee in callees[fn]:
+                if callee in members:
+                    callers[callee].append(fn)
+                elif fn not in memo and memo[callee] is not None:
+                    memo[fn] = (callee, memo[callee][1])
+                    reached.append(fn)
+
+        while reached:
+            target = reached.popleft()
+            for fn in callers[target]:
+                if fn not in memo:
+                    memo[fn] = (target, memo[target][1])
+                    reached.append(fn)
+
+        for fn in component:
+            memo.setdefault(fn, None)
+            del callees[fn]
+
+    def annotate(self) -> int:
+        """为间接触达阻塞调用的异步函数添加问题，返回新增问题数"""
+        added = 0
+        touched: Dict[int, AnalysisResult] = {}
+        for qualname, (result, module, _, facts) in self.functions.items():
+            if not facts["is_async"]:
+                continue
+            local = qualname[len(module) + 1 :]
+
+            reported = set()
+            for callee, line in facts["calls"]:
+                target = self._resolve(qualname, callee)
+                if target is None or self.functions[target][3]["is_async"]:
+                    continue
+                found = self.blocking_path(target)
+                if found is None or (line, target) in reported:
+                    continue
+                reported.add((line, target))
+                path, blocking = found
+                result.issues.append(
+                    AsyncIssue(
+                        file_path=result.file_path,
+                        line_number=line,
+                        issue_type="transitive_blocking_call",
+                        severity="critical",
+                        message=(
+                            f"异步函数 '{local}' 通过 {' -> '.join(path)} "
+                            f"间接调用了阻塞调用 '{blocking}'"
+                        ),
+                        suggestion=(
+                            f"将 '{path[0]}' 改为异步实现，"
+                            "或使用 asyncio.to_thread() 在线程中调用"
+                        ),
+                        original_code=linecache.getline(result.file_path, line).strip(),
+                    )
+                )
+                touched[id(result)] = result
+                added += 1
+
+        for result in touched.values():
+            result.issues.sort(key=lambda issue: issue.line_number)
+        return added
+
+
+# 文件 -> 变更行区间列表；None 表示整个文件都是新增的（未跟踪文件）
+ChangedFiles = Dict[Path, Optional[List[Tuple[int, int]]]]
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(RuntimeError):
+    """git 命令执行失败"""
+
+
+def _run_git(cwd: Path, *args: str) -> str:
+    """在 cwd 下执行 git 命令并返回标准输出"""
+    try:
+        proc = subprocess.run(
+            ["git", "-c", "core.quotepath=off", *args],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+        )
+    except FileNotFoundError as e:
+        raise GitError("未找到 git 可执行文件") from e
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.strip() or f"git {args[0]} 执行失败")
+    return proc.stdout
+
+
+def git_changed_files(
+    target: Path, since: str = "HEAD", exclude_patterns: List[str] = None
+) -> ChangedFiles:
+    """获取 target 下相对 since 修改过的 Python 文件及其变更行区间
+
+    比较的是 since 与当前工作区（包含已暂存和未暂存的修改），
+    未跟踪的新文件视为整个文件都发生了变更，已删除的文件会被忽略。
+    """
+    exclude_patterns = exclude_patterns or DEFAULT_EXCLUDE_PATTERNS
+    if target.is_file():
+        cwd, pathspec = target.parent, target.name
+    else:
+        cwd, pathspec = target, "."
+
+    diff = _run_git(
+        cwd,
+        "diff",
+        "--relative",
+        "--no-color",
+        "--no-ext-diff",
+        "--diff-filter=d",
+        "-U0",
+        since,
+        "--",
+        pathspec,
+    )
+
+    changed: ChangedFiles = {}
+    current: Optional[List[Tuple[int, int]]] = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            name = line[4:]
+            if name.startswith("b/"):
+                name = name[2:]
+            current = None
+            if name.endswith(".py"):
+                current = changed.setdefault(cwd / name, [])
+        elif current is not None and line.startswith("@@"):
+            match = _HUNK_HEADER.match(line)
+            if not match:
+                continue
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            # count 为 0 表示纯删除，没有新增行
+            if count:
+                current.append((start, start + count - 1))
+
+    untracked = _run_git(
+        cwd, "ls-files", "--others", "--exclude-standard", "--", pathspec
+    )
+    for name in untracked.splitlines():
+        if name.endswith(".py"):
+            changed[cwd / name] = None
+
+    return {
+        path: ranges
+        for path, ranges in changed.items()
+        if not any(pattern in str(path) for pattern in exclude_patterns)
+        and path.is_file()
+    }
+
+
+def filter_issues_to_ranges(
+    result: AnalysisResult, ranges: Optional[List[Tuple[int, int]]]
+) -> AnalysisResult:
+    """只保留落在变更行区间内的问题
+
+    ranges 为 None 时保留全部问题；行号为 0 的文件级问题
+    （如分析失败）始终保留。
+    """
+    if ranges is None:
+        return result
+    result.issues = [
+        issue
+        for issue in result.issues
+        if issue.line_number == 0
+        or any(start <= issue.line_number <= end for start, end in ranges)
+    ]
+    return result
+
+
+@dataclass
+class ReportSummary:
+    """报告摘要计数，随结果流式累加，无需对全部结果多次求和"""
+
+    total_files: int = 0
+    files_with_async: int = 0
+    total_issues: int = 0
+    critical_issues: int = 0
+    warnings: int = 0
+    prefilter_skipped: int = 0
+
+    def add(self, result: AnalysisResult):
+        self.total_files += 1
+        if result.skipped:
+            self.prefilter_skipped += 1
+        if result.has_async_code:
+            self.files_with_async += 1
+        self.total_issues += len(result.issues)
+        for issue in result.issues:
+            if issue.severity == "critical":
+                self.critical_issues += 1
+            elif issue.severity == "warning":
+                self.warnings += 1
+
+    def to_dict(
+        self, cache_stats: Optional[CacheStats] = None, prefilter: bool = False
+    ) -> Dict:
+        summary = asdict(self)
+        if not prefilter:
+            del summary["prefilter_skipped"]
+        if cache_stats is not None:
+            summary["cache"] = cache_stats.to_dict()
+        return summary
+
+
+SEVERITY_EMOJI = {"critical": "🔴", "warning": "🟡", "info": "🔵"}
+
+SARIF_LEVELS = {"critical": "error", "warning": "warning", "info": "note"}
+
+STREAM_FORMATS = ("ndjson", "sarif")
+
+
+def _file_report(result: AnalysisResult) -> Dict:
+    """单个文件在 JSON / NDJSON 报告中的内容"""
+    return {
+        "path": result.file_path,
+        "has_async_code": result.has_async_code,
+        "async_functions": result.async_functions,
+        "issues": [
+            {
+                "line": issue.line_number,
+                "type": issue.issue_type,
+                "severity": issue.severity,
+                "message": issue.message,
+                "suggestion": issue.suggestion,
+                "code": issue.original_code,
+            }
+            for issue in result.issues
+        ],
+    }
+
+
+def _markdown_file_lines(result: AnalysisResult) -> List[str]:
+    """单个文件在 Markdown 报告中的内容"""
+    lines = [f"## {result.file_path}\n"]
+    for issue in result.issues:
+        emoji = SEVERITY_EMOJI[issue.severity]
+        lines.append(f"{emoji} **{issue.issue_type}** (第 {issue.line_number} 行)")
+        lines.append(f"   - 问题: {issue.message}")
+        lines.append(f"   - 建议: {issue.suggestion}")
+        if issue.original_code:
+            lines.append(f"   - 代码: `{issue.original_code}`")
+        lines.append("")
+    return lines
+
+
+def generate_report(
+    results: List[AnalysisResult],
+    output_format: str = "json",
+    cache_stats: Optional[CacheStats] = None,
+    prefilter: bool = False,
+) -> str:
     """生成分析报告"""
+    summary = ReportSummary()
+    for result in results:
+        summary.add(result)
+
     if output_format == "json":
         report = {
-            "summary": {
-                "total_files": len(results),
-                "files_with_async": sum(1 for r in results if r.has_async_code),
-                "total_issues": sum(len(r.issues) for r in results),
-                "critical_issues": sum(
-                    1 for r in results for i in r.issues if i.severity == "critical"
-                ),
-                "warnings": sum(
-                    1 for r in results for i in r.issues if i.severity == "warning"
-                ),
-            },
-            "files": [],
+            "summary": summary.to_dict(cache_stats, prefilter),
+            "files": [
+                _file_report(result)
+                for result in results
+                if result.issues or result.has_async_code
+            ],
         }
-
-        for result in results:
-            if result.issues or result.has_async_code:
-                file_report = {
-                    "path": result.file_path,
-                    "has_async_code": result.has_async_code,
-                    "async_functions": result.async_functions,
-                    "issues": [
-                        {
-                            "line": issue.line_number,
-                            "type": issue.issue_type,
-                            "severity": issue.severity,
-                            "message": issue.message,
-                            "suggestion": issue.suggestion,
-                            "code": issue.original_code,
-                        }
-                        for issue in result.issues
-                    ],
-                }
-                report["files"].append(file_report)
-
         return json.dumps(report, indent=2, ensure_ascii=False)
 
     elif output_format == "markdown":
         lines = ["# Python 异步代码分析报告\n"]
 
-        critical_count = sum(
-            1 for r in results for i in r.issues if i.severity == "critical"
-        )
-        warning_count = sum(
-            1 for r in results for i in r.issues if i.severity == "warning"
-        )
-
         lines.append(f"## 摘要\n")
-        lines.append(f"- 分析文件数: {len(results)}")
-        lines.append(
-            f"- 包含异步代码的文件: {sum(1 for r in results if r.has_async_code)}"
-        )
-        lines.append(f"- 严重问题: {critical_count}")
-        lines.append(f"- 警告: {warning_count}\n")
+        lines.append(f"- 分析文件数: {summary.total_files}")
+        lines.append(f"- 包含异步代码的文件: {summary.files_with_async}")
+        lines.append(f"- 严重问题: {summary.critical_issues}")
+        lines.append(f"- 警告: {summary.warnings}")
+        if prefilter:
+            lines.append(f"- 预筛选跳过的文件: {summary.prefilter_skipped}")
+        if cache_stats is not None:
+            lines.append(
+                f"- 缓存: 命中 {cache_stats.hits} / 未命中 {cache_stats.misses}, "
+                f"读取 {cache_stats.bytes_read} 字节, 写入 {cache_stats.bytes_written} 字节, "
+                f"占用 {cache_stats.size_bytes} 字节, 淘汰 {cache_stats.evicted} 条"
+            )
+        lines.append("")
 
         for result in results:
             if result.issues:
-                lines.append(f"## {result.file_path}\n")
-                for issue in result.issues:
-                    emoji = {"critical": "🔴", "warning": "🟡", "info": "🔵"}[
-                        issue.severity
-                    ]
-                    lines.append(
-                        f"{emoji} **{issue.issue_type}** (第 {issue.line_number} 行)"
-                    )
-                    lines.append(f"   - 问题: {issue.message}")
-                    lines.append(f"   - 建议: {issue.suggestion}")
-                    if issue.original_code:
-                        lines.append(f"   - 代码: `{issue.original_code}`")
-                    lines.append("")
+                lines.extend(_markdown_file_lines(result))
 
         return "\n".join(lines)
 
     return ""
 
 
+def _sarif_uri(file_path: str) -> str:
+    """SARIF 的 artifactLocation.uri 必须是合法 URI，空格、# 和 % 等字符需要转义"""
+    path = Path(file_path)
+    if path.is_absolute():
+        return path.as_uri()
+    return urllib.parse.quote(path.as_posix())
+
+
+def _sarif_result(issue: AsyncIssue) -> Dict:
+    """把单个问题转换为 SARIF result 对象"""
+    location: Dict = {
+        "physicalLocation": {"artifactLocation": {"uri": _sarif_uri(issue.file_path)}}
+    }
+    if issue.line_number > 0:
+        location["physicalLocation"]["region"] = {"startLine": issue.line_number}
+    return {
+        "ruleId": issue.issue_type,
+        "level": SARIF_LEVELS.get(issue.severity, "warning"),
+        "message": {"text": f"{issue.message}。建议: {issue.suggestion}"},
+        "locations": [location],
+        "properties": {
+            "severity": issue.severity,
+            "suggestion": issue.suggestion,
+            "code": issue.original_code,
+        },
+    }
+
+
+def stream_report(
+    results: Iterable[AnalysisResult],
+    output_format: str,
+    out: TextIO,
+    cache: Optional[AnalysisCache] = None,
+    prefilter: bool = False,
+) -> ReportSummary:
+    """边分析边写出报告，内存占用与结果总数无关
+
+    - ndjson: 每个文件一行 {"type": "file", ...}，最后一行为 {"type": "summary", ...}
+    - sarif: SARIF 2.1.0 文档，每个问题一个 result，摘要写入 run.properties
+    """
+    summary = ReportSummary()
+
+    if output_format == "ndjson":
+        for result in results:
+            summary.add(result)
+            if result.issues or result.has_async_code:
+                record = {"type": "file", **_file_report(result)}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        totals = summary.to_dict(_finish_cache(cache), prefilter)
+        record = {"type": "summary", **totals}
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    elif output_format == "sarif":
+        out.write(
+            '{"version": "2.1.0", '
+            '"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            '"runs": [{"tool": {"driver": {"name": "analyze_async"}}, "results": ['
+        )
+        first = True
+        for result in results:
+            summary.add(result)
+            for issue in result.issues:
+                out.write("\n" if first else ",\n")
+                out.write(json.dumps(_sarif_result(issue), ensure_ascii=False))
+                first = False
+        properties = {"summary": summary.to_dict(_finish_cache(cache), prefilter)}
+        out.write(
+            "\n], "
+            f'"properties": {json.dumps(properties, ensure_ascii=False)}'
+            "}]}\n"
+        )
+
+    else:
+        raise ValueError(f"不支持流式输出的格式: {output_format}")
+
+    return summary
+
+
+def _finish_cache(cache: Optional[AnalysisCache]) -> Optional[CacheStats]:
+    """执行缓存淘汰并返回最终的缓存统计"""
+    if cache is None:
+        return None
+    cache.prune()
+    return cache.stats
+
+
+def _issue_key(issue: AsyncIssue) -> Tuple[str, str, str]:
+    """问题的身份标识，不含行号，避免编辑导致的行号偏移被当成新问题"""
+    return (issue.issue_type, issue.message, issue.original_code)
+
+
+def diff_issues(
+    old: List[AsyncIssue], new: List[AsyncIssue]
+) -> Tuple[List[AsyncIssue], List[AsyncIssue]]:
+    """比较同一文件前后两次的问题列表，返回 (新增问题, 已解决问题)"""
+    old_keys = Counter(_issue_key(issue) for issue in old)
+    new_keys = Counter(_issue_key(issue) for issue in new)
+    added_keys = new_keys - old_keys
+    resolved_keys = old_keys - new_keys
+
+    added = []
+    for issue in new:
+        key = _issue_key(issue)
+        if added_keys[key] > 0:
+            added_keys[key] -= 1
+            added.append(issue)
+    resolved = []
+    for issue in old:
+        key = _issue_key(issue)
+        if resolved_keys[key] > 0:
+            resolved_keys[key] -= 1
+            resolved.append(issue)
+    return added, resolved
+
+
+class WatchSession:
+    """常驻进程的监听会话
+
+    在内存中保留每个文件的分析结果和 (mtime, size) 戳，
+    文件变更时只重新分析变更的模块，并输出新增 / 已解决问题的差异。
+    """
+
+    def __init__(
+        self,
+        target: Path,
+        exclude_patterns: List[str] = None,
+        rules: Optional[RuleSelection] = None,
+        prefilter: bool = False,
+        cache: Optional[AnalysisCache] = None,
+        low_memory: bool = False,
+    ):
+        self.target = target
+        self.exclude_patterns = exclude_patterns
+        self.rules = rules
+        self.prefilter = prefilter
+        self.cache = cache
+        self.low_memory = low_memory
+        self.results: Dict[Path, AnalysisResult] = {}
+        self.stamps: Dict[Path, Tuple[int, int]] = {}
+
+    def _stamp(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _is_tracked(self, path: Path) -> bool:
+        patterns = self.exclude_patterns or DEFAULT_EXCLUDE_PATTERNS
+        return path.suffix == ".py" and not any(p in str(path) for p in patterns)
+
+    def initial_scan(self, jobs: int = 1) -> List[AnalysisResult]:
+        """首次全量分析，之后只做增量更新"""
+        files = list(iter_python_files(self.target, self.exclude_patterns))
+        results = iter_analyze_files(
+            files,
+            jobs,
+            cache=self.cache,
+            rules=self.rules,
+            prefilter=self.prefilter,
+            low_memory=self.low_memory,
+        )
+        for path, result in zip(files, results):
+            self.results[path] = result
+            self.stamps[path] = self._stamp(path)
+        return [self.results[path] for path in files]
+
+    def poll_changes(self) -> Set[Path]:
+        """轮询模式：扫描目录并返回 mtime / size 有变化、新增或删除的文件"""
+        current = set(iter_python_files(self.target, self.exclude_patterns))
+        changed = {path for path in self.stamps if path not in current}
+        for path in current:
+            if self.stamps.get(path) != self._stamp(path):
+                changed.add(path)
+        return changed
+
+    def refresh(
+        self, paths: Iterable[Path]
+    ) -> List[Tuple[str, List[AsyncIssue], List[AsyncIssue]]]:
+        """重新分析给定文件，返回 [(文件, 新增问题, 已解决问题), ...]"""
+        changes = []
+        for path in sorted(set(paths)):
+            if not self._is_tracked(path):
+                continue
+            old = self.results.get(path)
+            old_issues = old.issues if old else []
+            stamp = self._stamp(path)
+
+            if stamp is None:
+                # 文件已删除：其上的问题全部视为已解决
+                self.results.pop(path, None)
+                self.stamps.pop(path, None)
+                if old_issues:
+                    changes.append((str(path), [], list(old_issues)))
+                continue
+            if old is not None and self.stamps.get(path) == stamp:
+                continue
+
+            if self.cache is not None:
+                outcome = self.cache.analyze(path)
+                self.cache.record(outcome)
+                result = outcome.result
+            else:
+                result = analyze_file(path, self.rules, self.prefilter, self.low_memory)
+            self.results[path] = result
+            self.stamps[path] = stamp
+
+            added, resolved = diff_issues(old_issues, result.issues)
+            if added or resolved:
+                changes.append((str(path), added, resolved))
+        return changes
+
+
+def _print_watch_changes(
+    changes: List[Tuple[str, List[AsyncIssue], List[AsyncIssue]]], output_format: str
+):
+    """输出一轮增量分析的差异"""
+    for file_path, added, resolved in changes:
+        if output_format == "ndjson":
+            record = {
+                "type": "diff",
+                "path": file_path,
+                "added": _file_report(AnalysisResult(file_path, added))["issues"],
+                "resolved": _file_report(AnalysisResult(file_path, resolved))["issues"],
+            }
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+            continue
+        for issue in added:
+            emoji = SEVERITY_EMOJI[issue.severity]
+            print(f"+ {emoji} {file_path}:{issue.line_number} [{issue.issue_type}] {issue.message}")
+        for issue in resolved:
+            print(f"- ✅ {file_path}:{issue.line_number} [{issue.issue_type}] {issue.message}")
+    sys.stdout.flush()
+
+
+def _start_fs_observer(target: Path, dirty: Set[Path], lock: threading.Lock):
+    """尝试用 watchdog (inotify / FSEvents 等) 监听目录，不可用时返回 None"""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            paths = [getattr(event, "src_path", None), getattr(event, "dest_path", None)]
+            with lock:
+                for path in paths:
+                    if path:
+                        dirty.add(Path(os.fsdecode(path)))
+
+    observer = Observer()
+    observer.schedule(_Handler(), str(target), recursive=True)
+    observer.start()
+    return observer
+
+
+def watch(
+    target: Path,
+    output_format: str = "markdown",
+    interval: float = 1.0,
+    jobs: int = 1,
+    exclude_patterns: List[str] = None,
+    rules: Optional[RuleSelection] = None,
+    prefilter: bool = False,
+    cache: Optional[AnalysisCache] = None,
+    low_memory: bool = False,
+):
+    """监听目录变化并持续输出问题差异，Ctrl+C 退出
+
+    优先使用 watchdog 提供的系统文件事件 (Linux 上为 inotify)，
+    未安装 watchdog 时退化为按 interval 秒轮询 mtime / size。
+    """
+    session = WatchSession(
+        target, exclude_patterns, rules, prefilter, cache, low_memory
+    )
+    summary = ReportSummary()
+    for result in session.initial_scan(jobs):
+        summary.add(result)
+    print(
+        f"👀 正在监听 {target}: {summary.total_files} 个文件, "
+        f"{summary.total_issues} 个问题 (严重 {summary.critical_issues})",
+        file=sys.stderr,
+        flush=True,
+    )
+
+    dirty: Set[Path] = set()
+    lock = threading.Lock()
+    observer = _start_fs_observer(target, dirty, lock)
+    if observer is None:
+        print(f"未安装 watchdog，使用 {interval}s 轮询", file=sys.stderr, flush=True)
+
+    try:
+        while True:
+            time.sleep(interval)
+            if observer is None:
+                paths = session.poll_changes()
+            else:
+                with lock:
+                    paths = set(dirty)
+                    dirty.clear()
+            if paths:
+                _print_watch_changes(session.refresh(paths), output_format)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+
+
 def main():
     """主函数"""
     import argparse
 
     parser = argparse.ArgumentParser(description="分析 Python 异步代码质量")
-    parser.add_argument("path", help="要分析的 Python 文件或目录")
+    parser.add_argument("path", nargs="?", help="要分析的 Python 文件或目录")
     parser.add_argument(
-        "-f", "--format", choices=["json", "markdown"], default="json", help="输出格式"
+        "-f",
+        "--format",
+        choices=["json", "markdown", *STREAM_FORMATS],
+        default="json",
+        help="输出格式 (ndjson / sarif 为流式输出，逐个文件写出)",
     )
     parser.add_argument("-o", "--output", help="输出文件路径")
     parser.add_argument("--exclude", nargs="+", default=[], help="要排除的目录模式")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="并行分析的进程数 (默认 1，0 表示使用全部 CPU 核心)",
+    )
+    parser.add_argument(
+        "--cache-dir", help="启用增量缓存并指定缓存目录，未修改的文件不再重新解析"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=256,
+        help="缓存目录大小上限 (MB)，超出后按最近使用时间淘汰 (默认 256)",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REV",
+        help="只分析相对 git 版本 REV 有变更的文件 (含工作区修改和未跟踪文件)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="只分析相对 HEAD 有变更的文件，等价于 --since HEAD",
+    )
+    parser.add_argument(
+        "--changed-lines",
+        action="store_true",
+        help="配合 --since/--changed-only 使用，只报告变更行上的问题",
+    )
+    parser.add_argument(
+        "--rules-dir",
+        action="append",
+        default=[],
+        help="规则包目录，目录中的每个 .py 文件是一个规则包 (可多次指定)",
+    )
+    parser.add_argument(
+        "--enable-rules",
+        nargs="+",
+        default=[],
+        metavar="PACK",
+        help="启用的规则包名称，只有启用的规则包才会被导入",
+    )
+    parser.add_argument(
+        "--list-rules", action="store_true", help="列出可用的规则包后退出"
+    )
+    parser.add_argument(
+        "--transitive",
+        action="store_true",
+        help="构建项目级调用图，报告经由同步辅助函数间接触达阻塞调用的异步函数",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="常驻监听目录，文件变更时只重新分析变更的模块并输出新增/已解决问题",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=1.0,
+        help="监听模式下的检查间隔秒数 (默认 1.0)",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="低内存模式：直接解析原始字节，不保留解码后的源码副本",
+    )
+    parser.add_argument(
+        "--prefilter",
+        action="store_true",
+        help="先按关键字预筛选，跳过不含 async / await 等关键字的文件 (如纯同步代码)",
+    )
 
     args = parser.parse_args()
 
+    if args.list_rules:
+        for name, source in sorted(discover_rule_packs(args.rules_dir).items()):
+            print(f"{name}\t{source.origin}")
+        return
+    if args.path is None:
+        parser.error("缺少要分析的路径")
+
+    rules = RuleSelection(tuple(args.enable_rules), tuple(args.rules_dir))
+    try:
+        load_rule_set(rules)
+    except RuleLoadError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        sys.exit(1)
+
     target = Path(args.path)
+    cache = None
+    if args.cache_dir:
+        cache = AnalysisCache(
+            Path(args.cache_dir),
+            args.cache_max_mb * 1024 * 1024,
+            rules,
+            args.prefilter,
+            args.low_memory,
+            args.transitive,
+        )
 
-    if target.is_file():
-        results = [analyze_file(target)]
+    if args.transitive and (args.watch or args.prefilter):
+        parser.error("--transitive 不能与 --watch 或 --prefilter 同时使用")
+
+    if args.watch:
+        if not target.is_dir():
+            parser.error("--watch 需要指定一个目录")
+        watch(
+            target,
+            "ndjson" if args.format == "ndjson" else "markdown",
+            args.watch_interval,
+            resolve_jobs(args.jobs),
+            args.exclude,
+            rules,
+            args.prefilter,
+            cache,
+            args.low_memory,
+        )
+        return
+
+    since = args.since or ("HEAD" if args.changed_only else None)
+    if args.changed_lines and since is None:
+        parser.error("--changed-lines 需要配合 --since 或 --changed-only 使用")
+
+    jobs = resolve_jobs(args.jobs)
+    analyze = functools.partial(
+        iter_analyze_files,
+        cache=cache,
+        rules=rules,
+        prefilter=args.prefilter,
+        low_memory=args.low_memory,
+        call_graph=args.transitive,
+    )
+    if since is not None and target.exists():
+        try:
+            changed = git_changed_files(target, since, args.exclude)
+        except GitError as e:
+            print(f"错误: 无法获取变更文件: {e}", file=sys.stderr)
+            sys.exit(1)
+        files = list(changed)
+        results = analyze(files, jobs)
+        if args.changed_lines:
+            results = (
+                filter_issues_to_ranges(result, changed[Path(result.file_path)])
+                for result in results
+            )
+    elif target.is_file():
+        results = analyze([target])
     elif target.is_dir():
-        results = analyze_directory(target, args.exclude)
+        files = list(iter_python_files(target, args.exclude))
+        results = analyze(files, jobs)
     else:
         print(f"错误: 路径不存在 {target}", file=sys.stderr)
         sys.exit(1)
 
-    report = generate_report(results, args.format)
+    if args.transitive:
+        # 调用图需要全部文件的结果，流式格式在此之后再逐个写出
+        results = list(results)
+        root = target if target.is_dir() else target.parent
+        CallGraph(results, root).annotate()
+
+    if args.format in STREAM_FORMATS:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                stream_report(results, args.format, out, cache, args.prefilter)
+            print(f"报告已保存到: {args.output}")
+        else:
+            stream_report(results, args.format, sys.stdout, cache, args.prefilter)
+        return
+
+    results = list(results)
+    report = generate_report(
+        results, args.format, _finish_cache(cache), args.prefilter
+    )
 
     if args.output:
         Path(args.output).write_text(report, encoding="utf-8")
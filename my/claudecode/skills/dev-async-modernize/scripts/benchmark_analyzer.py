@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+异步代码分析器基准测试
+测量规则表增长时每个 ast.Call 节点的规则匹配开销、大文件内存峰值、
+未启用规则包时的整体遍历开销，以及 --prefilter 的跳过比例
+"""
+
+import ast
+import dataclasses
+import functools
+import re
+import sys
+import sysconfig
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from analyze_async import (  # noqa: E402
+    AsyncCodeAnalyzer,
+    AsyncIssue,
+    CallRuleIndex,
+    RulePackSource,
+    RuleSet,
+    analyze_file,
+    iter_python_files,
+    load_rule_set,
+    needs_analysis,
+)
+
+
+def build_rule_tables(size: int) -> Tuple[Dict, Dict]:
+    """在内置规则表之后追加合成规则，直到规则数达到 size"""
+    blocking = dict(AsyncCodeAnalyzer.BLOCKING_CALLS)
+    deprecated = dict(AsyncCodeAnalyzer.DEPRECATED_APIS)
+    i = 0
+    while len(blocking) < size:
+        blocking[f"vendor{i}.client.fetch_sync_{i}"] = {
+            "replacement": f"vendor{i}.aio.fetch_{i}",
+            "context": "async",
+        }
+        deprecated[f"legacy{i}.loop_{i}"] = {"replacement": "x", "reason": "y"}
+        i += 1
+    return blocking, deprecated
+
+
+def build_call_names(count: int) -> List[str]:
+    """生成一批调用名，大部分不命中规则，少量命中阻塞调用"""
+    names = []
+    for i in range(count):
+        if i % 10 == 0:
+            names.append("time.sleep")
+        elif i % 10 == 1:
+            names.append(f"vendor{i % 50}.client.fetch_sync_{i % 50}")
+        else:
+            names.append(f"service{i}.handler.process_item_{i}")
+    return names
+
+
+def legacy_match(
+    call_name: str, blocking: Dict, deprecated: Dict
+) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """旧实现：逐条扫描规则表做子串 / 后缀判断"""
+    blocking_info = None
+    for pattern, info in blocking.items():
+        if pattern in call_name or call_name.endswith(pattern.split(".")[-1]):
+            blocking_info = info
+            break
+    deprecated_info = None
+    for pattern, info in deprecated.items():
+        if pattern in call_name:
+            deprecated_info = info
+            break
+    return blocking_info, deprecated_info
+
+
+def bench_dispatch(sizes: List[int], nodes: int, repeat: int):
+    """对比线性扫描与预编译索引的单节点开销"""
+    names = build_call_names(nodes)
+    indicators = AsyncCodeAnalyzer.COROUTINE_INDICATORS
+
+    print(f"调用节点数: {nodes}，重复次数: {repeat}\n")
+    print(f"{'规则数':>8} {'线性扫描 μs/节点':>18} {'索引(冷) μs/节点':>18} {'索引(热) μs/节点':>18}")
+
+    for size in sizes:
+        blocking, deprecated = build_rule_tables(size)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            expected = [legacy_match(n, blocking, deprecated) for n in names]
+        legacy = (time.perf_counter() - start) / (repeat * nodes)
+
+        # 冷启动：每轮重建索引，调用名都需要走一遍自动机
+        cold = 0.0
+        for _ in range(repeat):
+            index = CallRuleIndex(blocking, deprecated, indicators)
+            start = time.perf_counter()
+            actual = [index.classify(n) for n in names]
+            cold += time.perf_counter() - start
+        cold /= repeat * nodes
+
+        # 热路径：调用名已在缓存中，相当于大仓库中反复出现的调用
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for n in names:
+                index.classify(n)
+        warm = (time.perf_counter() - start) / (repeat * nodes)
+
+        for exp, info in zip(expected, actual):
+            assert exp == (info.blocking, info.deprecated), "索引结果与线性扫描不一致"
+
+        print(f"{size:>8} {legacy * 1e6:>18.3f} {cold * 1e6:>18.3f} {warm * 1e6:>18.3f}")
+
+
+def build_large_source(size_mb: float) -> str:
+    """生成指定大小的合成源码，模拟生成代码：大量同步函数夹杂少量异步问题"""
+    chunks = ["import asyncio\nimport time\n\n"]
+    size = len(chunks[0])
+    i = 0
+    while size < size_mb * 1024 * 1024:
+        if i % 50 == 0:
+            chunk = f"async def handler_{i}(x):\n    time.sleep(0.1)\n    return x\n\n"
+        else:
+            chunk = (
+                f"def generated_{i}(value):\n"
+                f"    result = value * {i} + {i % 7}\n"
+                f"    return {{'id': {i}, 'value': result, 'name': 'item_{i}'}}\n\n"
+            )
+        chunks.append(chunk)
+        size += len(chunk)
+        i += 1
+    return "".join(chunks)
+
+
+def _peak_of(func) -> Tuple[int, float, object]:
+    """返回 (tracemalloc 峰值字节数, 耗时秒, 返回值)"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed, value
+
+
+def bench_memory(sizes_mb: List[float], issues: int):
+    """对比默认模式与低内存模式分析大文件时的内存峰值"""
+    mb = 1024 * 1024
+    print(f"{'文件大小':>8} {'默认峰值 MB':>12} {'低内存峰值 MB':>14} {'行列表 MB':>10} {'默认 s':>8} {'低内存 s':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in sizes_mb:
+            path = Path(tmp) / f"generated_{size_mb}.py"
+            source = build_large_source(size_mb)
+            path.write_text(source, encoding="utf-8")
+
+            # 旧实现中与 AST 同时存活的 split("\n") 行列表
+            lines_peak, _, lines = _peak_of(functools.partial(source.split, "\n"))
+            del lines, source
+
+            default_peak, default_s, default = _peak_of(lambda: analyze_file(path))
+            lean_peak, lean_s, lean = _peak_of(
+                lambda: analyze_file(path, low_memory=True)
+            )
+            assert default.issues == lean.issues, "低内存模式结果与默认模式不一致"
+
+            print(
+                f"{size_mb:>7}M {default_peak / mb:>12.1f} {lean_peak / mb:>14.1f} "
+                f"{lines_peak / mb:>10.1f} {default_s:>8.2f} {lean_s:>9.2f}"
+            )
+
+    # __slots__ 数据类与普通数据类的对象开销
+    plain_issue = dataclasses.make_dataclass(
+        "PlainIssue", [(f.name, f.type) for f in dataclasses.fields(AsyncIssue)]
+    )
+    args = ("a.py", 1, "blocking_call_in_async", "critical", "msg", "fix", "code")
+    plain_peak, _, plain = _peak_of(lambda: [plain_issue(*args) for _ in range(issues)])
+    del plain
+    slots_peak, _, slotted = _peak_of(lambda: [AsyncIssue(*args) for _ in range(issues)])
+    del slotted
+    print(
+        f"\n{issues} 个 AsyncIssue: 普通数据类 {plain_peak / mb:.1f} MB, "
+        f"__slots__ 数据类 {slots_peak / mb:.1f} MB"
+    )
+
+
+class AlwaysDispatchAnalyzer(AsyncCodeAnalyzer):
+    """旧实现：无论是否启用节点规则，每个节点都先查一次规则表"""
+
+    visit = AsyncCodeAnalyzer._visit_with_rules
+
+
+class NoBareExcept:
+    """与 SKILL.md 示例相同的节点规则，用于测量启用规则包后的开销"""
+
+    node_types = (ast.ExceptHandler,)
+
+    def check(self, node, analyzer):
+        if node.type is None and analyzer.is_async_context:
+            analyzer.add_issue(
+                node.lineno, "bare_except", "warning",
+                "异步函数中使用了裸 except", "至少捕获 Exception",
+            )
+
+
+def bench_packs(target: Path, repeat: int):
+    """对比未启用规则包、旧的始终分发实现与启用节点规则包时的遍历耗时"""
+    plain = RuleSet()
+    pack = type("bench_pack", (), {"RULES": [NoBareExcept()]})
+    with_pack = RuleSet([(RulePackSource("bench_pack", __file__), pack)])
+    rows = [
+        ("无规则包", AsyncCodeAnalyzer, plain),
+        ("无规则包 (始终分发)", AlwaysDispatchAnalyzer, plain),
+        ("节点规则包", AsyncCodeAnalyzer, with_pack),
+    ]
+    totals = [0.0] * len(rows)
+    files = 0
+
+    # 每个文件只解析一次，各实现交替计时并取最优，只统计遍历本身
+    for path in iter_python_files(target):
+        try:
+            source = path.read_text(encoding="utf-8")
+            tree = ast.parse(source)
+        except (SyntaxError, UnicodeDecodeError, ValueError, OSError):
+            continue
+        files += 1
+        for i, (_, analyzer_cls, rule_set) in enumerate(rows):
+            best = float("inf")
+            for _ in range(repeat):
+                analyzer = analyzer_cls(str(path), source, rule_set)
+                start = time.perf_counter()
+                analyzer.visit(tree)
+                best = min(best, time.perf_counter() - start)
+            totals[i] += best
+        del tree
+
+    print(f"目录: {target}，文件数: {files}，每个文件取 {repeat} 次中的最优值\n")
+    print(f"{'实现':<16} {'遍历 s':>8} {'相对无规则包':>12}")
+    for (label, _, _), total in zip(rows, totals):
+        print(f"{label:<16} {total:>8.3f} {total / totals[0]:>11.2f}x")
+
+
+def bench_prefilter(target: Path):
+    """统计 --prefilter 的跳过比例、耗时，以及被跳过文件中丢失的问题"""
+    rule_set = load_rule_set()
+    # 对照：把协程特征词也作为不区分大小写的关键字时的预筛选
+    with_indicators = re.compile(
+        rule_set.prefilter.pattern
+        + b"|"
+        + b"|".join(re.escape(w.encode()) for w in AsyncCodeAnalyzer.COROUTINE_INDICATORS),
+        re.IGNORECASE,
+    )
+
+    files = skipped = skipped_with_indicators = 0
+    full_s = prefilter_s = 0.0
+    lost: Counter = Counter()
+    for path in iter_python_files(target):
+        content = path.read_bytes()
+        files += 1
+        skipped_with_indicators += with_indicators.search(content) is None
+
+        start = time.perf_counter()
+        result = analyze_file(path, prefilter=True)
+        prefilter_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = analyze_file(path)
+        full_s += time.perf_counter() - start
+
+        if result.skipped:
+            assert not needs_analysis(content, rule_set)
+            skipped += 1
+            lost.update(issue.issue_type for issue in full.issues)
+
+    print(f"目录: {target}，文件数: {files}\n")
+    print(f"{'预筛选关键字':<24} {'跳过文件':>8} {'跳过比例':>8}")
+    print(f"{'async / await 等 (当前)':<24} {skipped:>8} {skipped / max(files, 1):>8.1%}")
+    print(
+        f"{'加协程特征词 (不区分大小写)':<24} {skipped_with_indicators:>8} "
+        f"{skipped_with_indicators / max(files, 1):>8.1%}"
+    )
+    print(f"\n不预筛选 {full_s:.2f}s，预筛选 {prefilter_s:.2f}s")
+    print(f"被跳过文件中丢失的问题: {dict(lost) or '无'}")
+
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="异步代码分析器基准测试")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    dispatch = sub.add_parser("dispatch", help="规则匹配的单节点开销")
+    dispatch.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[25, 100, 300, 1000],
+        help="规则表大小 (默认 25 100 300 1000)",
+    )
+    dispatch.add_argument("--nodes", type=int, default=5000, help="调用节点数")
+    dispatch.add_argument("--repeat", type=int, default=3, help="重复次数")
+
+    memory = sub.add_parser("memory", help="大文件分析的内存峰值")
+    memory.add_argument(
+        "--sizes-mb",
+        type=float,
+        nargs="+",
+        default=[1, 4],
+        help="合成源码文件大小 (MB，默认 1 4)",
+    )
+    memory.add_argument(
+        "--issues", type=int, default=100000, help="用于比较对象开销的问题数量"
+    )
+
+    packs = sub.add_parser("packs", help="未启用 / 启用规则包时的遍历开销")
+    packs.add_argument(
+        "--target",
+        type=Path,
+        default=Path(sysconfig.get_paths()["stdlib"]),
+        help="用作语料的目录 (默认当前解释器的标准库)",
+    )
+    packs.add_argument("--repeat", type=int, default=3, help="每个文件的重复次数")
+
+    prefilter = sub.add_parser("prefilter", help="--prefilter 的跳过比例")
+    prefilter.add_argument(
+        "--target",
+        type=Path,
+        default=Path(sysconfig.get_paths()["stdlib"]),
+        help="用作语料的目录 (默认当前解释器的标准库)",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "dispatch":
+        bench_dispatch(args.sizes, args.nodes, args.repeat)
+    elif args.command == "memory":
+        bench_memory(args.sizes_mb, args.issues)
+    elif args.command == "packs":
+        bench_packs(args.target, args.repeat)
+    elif args.command == "prefilter":
+        bench_prefilter(args.target)
+
+
+if __name__ == "__main__":
+    main()
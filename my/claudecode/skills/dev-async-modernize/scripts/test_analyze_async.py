@@ -0,0 +1,266 @@
+"""analyze_async 回归测试"""
+
+import io
+import json
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from analyze_async import (  # noqa: E402
+    CallGraph,
+    RuleSelection,
+    analyze_file,
+    stream_report,
+)
+
+MUTUAL_RECURSION = """
+import time
+
+
+def a():
+    b()
+    sleeper()
+
+
+def b():
+    a()
+
+
+def sleeper():
+    time.sleep(1)
+
+
+async def first():
+    a()
+
+
+async def second():
+    b()
+
+
+def x():
+    y()
+
+
+def y():
+    x()
+
+
+async def clean():
+    x()
+"""
+
+
+def write(path: Path, source: str) -> Path:
+    path.write_text(textwrap.dedent(source).lstrip(), encoding="utf-8")
+    return path
+
+
+def transitive_messages(tmp_path: Path, source: str):
+    path = write(tmp_path / "mod.py", source)
+    result = analyze_file(path, call_graph=True)
+    CallGraph([result], tmp_path).annotate()
+    return {
+        issue.message.split("'")[1]: issue.message
+        for issue in result.issues
+        if issue.issue_type == "transitive_blocking_call"
+    }
+
+
+@pytest.mark.parametrize("second_first", [False, True])
+def test_mutual_recursion_is_reported_in_any_visit_order(tmp_path, second_first):
+    source = MUTUAL_RECURSION
+    if second_first:
+        # 先定义 second，调用图先从 b 进入 a -> b 的环
+        first = "async def first():\n    a()\n\n\n"
+        source = source.replace(first, "").replace(
+            "def x():", first + "def x():"
+        )
+    messages = transitive_messages(tmp_path, source)
+
+    assert set(messages) == {"first", "second"}
+    assert "mod.b -> mod.a -> mod.sleeper" in messages["second"]
+    assert "mod.a -> mod.sleeper" in messages["first"]
+
+
+def test_cycle_without_blocking_call_is_not_reported(tmp_path):
+    messages = transitive_messages(
+        tmp_path,
+        """
+        def x():
+            y()
+
+
+        def y():
+            x()
+
+
+        async def clean():
+            x()
+        """,
+    )
+    assert messages == {}
+
+
+def test_call_graph_is_only_built_when_requested(tmp_path):
+    path = write(tmp_path / "mod.py", MUTUAL_RECURSION)
+    assert analyze_file(path).call_graph == {}
+    assert analyze_file(path, call_graph=True).call_graph["a"]["calls"]
+
+
+def issue_tuples(result):
+    return [
+        (issue.line_number, issue.issue_type, issue.message, issue.original_code)
+        for issue in result.issues
+    ]
+
+
+@pytest.mark.parametrize("padding", [0, 2000])
+def test_low_memory_matches_default_for_coding_cookie(tmp_path, padding):
+    # padding 让文件超过 LOW_MEMORY_CHUNK_SIZE，走分块解析
+    body = "".join(f"def helper_{i}():\n    return {i}\n\n" for i in range(padding))
+    source = (
+        "# -*- coding: latin-1 -*-\n"
+        "import time\n"
+        f"{body}"
+        "async def handler():\n"
+        "    label = 'café'\n"
+        "    time.sleep(1)  # bloqué\n"
+    )
+    path = tmp_path / "latin.py"
+    path.write_bytes(source.encode("latin-1"))
+
+    default = analyze_file(path)
+    low_memory = analyze_file(path, low_memory=True)
+    assert issue_tuples(default) == issue_tuples(low_memory)
+    assert any(
+        issue.issue_type == "blocking_call_in_async" and "bloqué" in issue.original_code
+        for issue in default.issues
+    )
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"async def f():\n    return '\xff'\n",  # 非法 UTF-8，且没有编码声明
+        b"# coding: no-such-codec\nasync def f():\n    pass\n",
+        "\ufeffimport time\nasync def f():\n    time.sleep(1)\n".encode("utf-8"),
+    ],
+)
+def test_low_memory_matches_default_for_unusual_encodings(tmp_path, content):
+    path = tmp_path / "mod.py"
+    path.write_bytes(content)
+    assert issue_tuples(analyze_file(path)) == issue_tuples(
+        analyze_file(path, low_memory=True)
+    )
+
+
+def test_low_memory_strips_bom_from_first_line(tmp_path):
+    # 问题在第 1 行，original_code 不能带上 BOM
+    path = tmp_path / "bom.py"
+    path.write_bytes(b"\xef\xbb\xbfasync def f(): time.sleep(1)\n")
+
+    default = analyze_file(path)
+    low_memory = analyze_file(path, low_memory=True)
+    assert issue_tuples(default) == issue_tuples(low_memory)
+    assert [issue.original_code for issue in low_memory.issues] == [
+        "async def f(): time.sleep(1)"
+    ]
+
+
+def test_rule_pack_blocking_calls_apply_to_await(tmp_path):
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    write(
+        rules_dir / "internal_io.py",
+        """
+        BLOCKING_CALLS = {
+            "corp_http.fetch": {"replacement": "corp_http.aio.fetch", "context": "async"},
+        }
+        """,
+    )
+    path = write(
+        tmp_path / "mod.py",
+        """
+        import time
+        import corp_http
+
+
+        async def handler():
+            await corp_http.fetch()
+            await time.sleep(1)
+        """,
+    )
+
+    def awaited(rules):
+        return {
+            issue.message
+            for issue in analyze_file(path, rules).issues
+            if issue.issue_type == "awaiting_blocking_call"
+        }
+
+    assert awaited(None) == {"await 了阻塞调用 'time.sleep'"}
+    assert awaited(RuleSelection(("internal_io",), (str(rules_dir),))) == {
+        "await 了阻塞调用 'corp_http.fetch'",
+        "await 了阻塞调用 'time.sleep'",
+    }
+
+
+def test_prefilter_skips_sync_files(tmp_path):
+    # 同步文件中的 bare_coroutine_call 启发式结果在预筛选时放弃
+    sync_only = write(
+        tmp_path / "client.py",
+        """
+        def refresh(conn):
+            conn.fetch_rows()
+            conn.Close()
+        """,
+    )
+    asynchronous = write(
+        tmp_path / "handler.py",
+        """
+        async def handler(conn):
+            conn.fetch_rows()
+        """,
+    )
+    # 关键字区分大小写，ASYNC_TIMEOUT 这类常量名不会让文件通过预筛选
+    constants = write(tmp_path / "constants.py", "ASYNC_TIMEOUT = 30\nRETRIES = 3\n")
+
+    assert analyze_file(sync_only, prefilter=True).skipped
+    assert analyze_file(constants, prefilter=True).skipped
+    result = analyze_file(asynchronous, prefilter=True)
+    assert not result.skipped
+    assert issue_tuples(result) == issue_tuples(analyze_file(asynchronous))
+
+
+@pytest.mark.parametrize("relative", [True, False])
+def test_sarif_uris_are_percent_encoded(tmp_path, monkeypatch, relative):
+    monkeypatch.chdir(tmp_path)
+    directory = tmp_path / "my project"
+    directory.mkdir()
+    path = write(
+        directory / "a#b%c.py",
+        """
+        import time
+
+
+        async def f():
+            time.sleep(1)
+        """,
+    )
+    if relative:
+        path = path.relative_to(tmp_path)
+
+    out = io.StringIO()
+    stream_report([analyze_file(path)], "sarif", out)
+    uris = {
+        location["physicalLocation"]["artifactLocation"]["uri"]
+        for result in json.loads(out.getvalue())["runs"][0]["results"]
+        for location in result["locations"]
+    }
+    expected = "my%20project/a%23b%25c.py"
+    assert uris == {expected if relative else f"{tmp_path.as_uri()}/{expected}"}
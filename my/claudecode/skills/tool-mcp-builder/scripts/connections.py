@@ -1,6 +1,11 @@
 """Lightweight connection handling for MCP servers."""
 
+import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
 from contextlib import AsyncExitStack
 from typing import Any
 
@@ -10,12 +15,155 @@ from mcp.client.stdio import stdio_client
 from mcp.client.streamable_http import streamablehttp_client
 
 
+class ToolCallCancelledError(RuntimeError):
+    """The caller running a shared tool call was cancelled before it finished.
+
+    Raised to the other callers waiting on the same call instead of
+    cancelling them; the call itself can be retried.
+    """
+
+
+class ToolResultCache:
+    """TTL + LRU cache of tool results keyed by tool name and canonical arguments.
+
+    Only cacheable tools are cached. If ``cacheable`` is None, tools the server
+    annotates as read-only (``readOnlyHint``) are cacheable; names listed in
+    ``uncacheable`` are never cached. Error results are not cached, and
+    concurrent identical calls share one in-flight request; if the caller
+    running it is cancelled, the others get ToolCallCancelledError.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_entries: int = 1024,
+        cacheable: Iterable[str] = None,
+        uncacheable: Iterable[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cacheable = set(cacheable) if cacheable is not None else None
+        self.uncacheable = set(uncacheable or ())
+        self._read_only = set()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def register_tools(self, tools: Iterable[Any]):
+        """Record which tools the server annotates as read-only."""
+        for tool in tools:
+            annotations = getattr(tool, "annotations", None)
+            if annotations is not None and getattr(annotations, "readOnlyHint", False):
+                self._read_only.add(tool.name)
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        if tool_name in self.uncacheable:
+            return False
+        if self.cacheable is not None:
+            return tool_name in self.cacheable
+        return tool_name in self._read_only
+
+    @staticmethod
+    def key_for(tool_name: str, arguments: dict[str, Any]) -> tuple[str, str]:
+        canonical = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return tool_name, canonical
+
+    def get(self, key: tuple[str, str]) -> tuple[bool, Any]:
+        """Return (found, value), dropping the entry if it has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def put(self, key: tuple[str, str], value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def call(self, tool_name: str, arguments: dict[str, Any], fetch) -> Any:
+        """Return the cached result for this call, or await ``fetch()`` and cache it.
+
+        ``fetch`` returns (content, is_error); error results are not cached.
+        """
+        if not self.is_cacheable(tool_name):
+            content, _ = await fetch()
+            return content
+
+        key = self.key_for(tool_name, arguments)
+        found, value = self.get(key)
+        if found:
+            self.hits += 1
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            content, is_error = await fetch()
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; waiters get an error they can retry
+            future.set_exception(ToolCallCancelledError(f"Shared call to tool {tool_name} was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        if not is_error:
+            self.put(key, content)
+        future.set_result(content)
+        return content
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def _tool_schemas(tools: Iterable[Any]) -> list[dict[str, Any]]:
+    """Convert MCP tool definitions to Anthropic tool schemas."""
+    return [
+        {
+            "name": tool.name,
+            "description": tool.description,
+            "input_schema": tool.inputSchema,
+        }
+        for tool in tools
+    ]
+
+
 class MCPConnection(ABC):
     """Base class for MCP server connections."""
 
-    def __init__(self):
+    def __init__(self, result_cache: ToolResultCache = None):
         self.session = None
         self._stack = None
+        self.result_cache = result_cache
 
     @abstractmethod
     def _create_context(self):
@@ -55,26 +203,34 @@ class MCPConnection(ABC):
     async def list_tools(self) -> list[dict[str, Any]]:
         """Retrieve available tools from the MCP server."""
         response = await self.session.list_tools()
-        return [
-            {
-                "name": tool.name,
-                "description": tool.description,
-                "input_schema": tool.inputSchema,
-            }
-            for tool in response.tools
-        ]
+        if self.result_cache is not None:
+            self.result_cache.register_tools(response.tools)
+        return _tool_schemas(response.tools)
+
+    async def call_tool_with_status(self, tool_name: str, arguments: dict[str, Any]) -> tuple[Any, bool]:
+        """Call a tool, bypassing the result cache, and return (content, is_error)."""
+        result = await self.session.call_tool(tool_name, arguments=arguments)
+        return result.content, bool(getattr(result, "isError", False))
 
     async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
         """Call a tool on the MCP server with provided arguments."""
-        result = await self.session.call_tool(tool_name, arguments=arguments)
-        return result.content
+        if self.result_cache is None:
+            content, _ = await self.call_tool_with_status(tool_name, arguments)
+            return content
+        return await self.result_cache.call(tool_name, arguments, lambda: self.call_tool_with_status(tool_name, arguments))
 
 
 class MCPConnectionStdio(MCPConnection):
     """MCP connection using standard input/output."""
 
-    def __init__(self, command: str, args: list[str] = None, env: dict[str, str] = None):
-        super().__init__()
+    def __init__(
+        self,
+        command: str,
+        args: list[str] = None,
+        env: dict[str, str] = None,
+        result_cache: ToolResultCache = None,
+    ):
+        super().__init__(result_cache)
         self.command = command
         self.args = args or []
         self.env = env
@@ -88,8 +244,8 @@ class MCPConnectionStdio(MCPConnection):
 class MCPConnectionSSE(MCPConnection):
     """MCP connection using Server-Sent Events."""
 
-    def __init__(self, url: str, headers: dict[str, str] = None):
-        super().__init__()
+    def __init__(self, url: str, headers: dict[str, str] = None, result_cache: ToolResultCache = None):
+        super().__init__(result_cache)
         self.url = url
         self.headers = headers or {}
 
@@ -100,8 +256,8 @@ class MCPConnectionSSE(MCPConnection):
 class MCPConnectionHTTP(MCPConnection):
     """MCP connection using Streamable HTTP."""
 
-    def __init__(self, url: str, headers: dict[str, str] = None):
-        super().__init__()
+    def __init__(self, url: str, headers: dict[str, str] = None, result_cache: ToolResultCache = None):
+        super().__init__(result_cache)
         self.url = url
         self.headers = headers or {}
 
@@ -109,6 +265,245 @@ class MCPConnectionHTTP(MCPConnection):
         return streamablehttp_client(url=self.url, headers=self.headers)
 
 
+class _PooledSession:
+    """One connection in an MCPConnectionPool together with its load stats."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.connection = None
+        self.ready = asyncio.Event()
+        self.failed = asyncio.Event()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.restarts = 0
+        self.health_failures = 0
+        self.busy_seconds = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "session": self.index,
+            "healthy": self.ready.is_set() and not self.failed.is_set(),
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "restarts": self.restarts,
+            "health_failures": self.health_failures,
+            "busy_seconds": self.busy_seconds,
+        }
+
+
+class MCPConnectionPool:
+    """Pool of MCP connections that spreads tool calls across N server sessions.
+
+    Each session is owned by its own worker task, which opens the connection,
+    waits until the session is marked failed or the pool closes, and then
+    closes it in the same task. Failed sessions are restarted automatically.
+    A periodic ping marks unresponsive sessions as failed, and so does a
+    failed ping after a call raises. Each call goes to the healthy session
+    with the fewest in-flight calls.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], MCPConnection],
+        size: int = 4,
+        health_check_interval: float = 30.0,
+        health_check_timeout: float = 10.0,
+        restart_delay: float = 1.0,
+        acquire_timeout: float = 60.0,
+        result_cache: ToolResultCache = None,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.restart_delay = restart_delay
+        self.acquire_timeout = acquire_timeout
+        self.result_cache = result_cache
+        self._sessions = []
+        self._workers = []
+        self._background = set()
+        self._closing = None
+
+    async def __aenter__(self):
+        """Start all sessions and wait until each has connected once."""
+        self._closing = asyncio.Event()
+        self._sessions = [_PooledSession(i) for i in range(self.size)]
+        loop = asyncio.get_running_loop()
+        started = [loop.create_future() for _ in self._sessions]
+        self._workers = [
+            asyncio.create_task(self._run_session(session, first_start))
+            for session, first_start in zip(self._sessions, started)
+        ]
+        try:
+            await asyncio.gather(*started)
+        except BaseException:
+            await self.__aexit__(None, None, None)
+            raise
+        self._spawn(self._health_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Close every session and stop background tasks."""
+        if self._closing is None:
+            return
+        self._closing.set()
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, *self._workers, return_exceptions=True)
+        self._background.clear()
+        self._workers = []
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _run_session(self, session: _PooledSession, first_start: asyncio.Future):
+        while not self._closing.is_set():
+            try:
+                async with self.factory() as connection:
+                    session.connection = connection
+                    session.failed.clear()
+                    session.ready.set()
+                    if not first_start.done():
+                        first_start.set_result(None)
+                    await _wait_first(session.failed, self._closing)
+            except Exception as e:
+                if not first_start.done():
+                    first_start.set_exception(e)
+                    return
+                print(f"⚠️  MCP session {session.index} failed: {e}")
+            finally:
+                session.ready.clear()
+                session.connection = None
+
+            if self._closing.is_set():
+                return
+            session.restarts += 1
+            print(f"🔄 Restarting MCP session {session.index} (restart #{session.restarts})")
+            await asyncio.sleep(self.restart_delay)
+
+    async def _check(self, session: _PooledSession) -> bool:
+        """Ping one session, marking it failed if it does not answer in time."""
+        connection = session.connection
+        if connection is None or session.failed.is_set():
+            return False
+        try:
+            await asyncio.wait_for(connection.session.send_ping(), self.health_check_timeout)
+            return True
+        except Exception:
+            session.health_failures += 1
+            session.failed.set()
+            return False
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await asyncio.gather(*(self._check(s) for s in self._sessions if s.ready.is_set()))
+
+    async def health_check(self) -> list[bool]:
+        """Ping every session now; failed sessions are restarted in the background."""
+        return list(await asyncio.gather(*(self._check(s) for s in self._sessions)))
+
+    async def _acquire(self) -> _PooledSession:
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            healthy = [s for s in self._sessions if s.ready.is_set() and not s.failed.is_set()]
+            if healthy:
+                return min(healthy, key=lambda s: (s.in_flight, s.calls))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError("No healthy MCP session available")
+            waiters = [asyncio.create_task(s.ready.wait()) for s in self._sessions]
+            try:
+                await asyncio.wait(waiters, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    async def list_tools(self) -> list[dict[str, Any]]:
+        """Retrieve available tools from one of the pooled sessions."""
+        session = await self._acquire()
+        response = await session.connection.session.list_tools()
+        if self.result_cache is not None:
+            self.result_cache.register_tools(response.tools)
+        return _tool_schemas(response.tools)
+
+    async def call_tool_with_status(self, tool_name: str, arguments: dict[str, Any]) -> tuple[Any, bool]:
+        """Call a tool on the least loaded healthy session, bypassing the result cache.
+
+        Returns (content, is_error).
+        """
+        session = await self._acquire()
+        connection = session.connection
+        session.calls += 1
+        session.in_flight += 1
+        session.max_in_flight = max(session.max_in_flight, session.in_flight)
+        start = time.perf_counter()
+        try:
+            result = await connection.session.call_tool(tool_name, arguments=arguments)
+        except Exception:
+            session.errors += 1
+            # Transport errors usually mean the server died; confirm with a ping
+            self._spawn(self._check(session))
+            raise
+        finally:
+            session.in_flight -= 1
+            session.busy_seconds += time.perf_counter() - start
+        return result.content, bool(getattr(result, "isError", False))
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        """Call a tool on the least loaded healthy session."""
+        if self.result_cache is None:
+            content, _ = await self.call_tool_with_status(tool_name, arguments)
+            return content
+        return await self.result_cache.call(tool_name, arguments, lambda: self.call_tool_with_status(tool_name, arguments))
+
+    def session_stats(self) -> list[dict[str, Any]]:
+        """Return per-session load stats."""
+        return [session.stats() for session in self._sessions]
+
+
+async def _wait_first(*events: asyncio.Event):
+    """Wait until any of the events is set."""
+    waiters = [asyncio.create_task(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
+class ToolCallRecorder:
+    """Wrap a connection and append every call_tool invocation to a JSONL file.
+
+    Each line is ``{"tool": name, "arguments": {...}}``, the script format
+    read by loadtest.py. Other attributes are forwarded to the wrapped
+    connection.
+    """
+
+    def __init__(self, connection: Any, path: Any):
+        self.connection = connection
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.connection, name)
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        self._file.write(json.dumps({"tool": tool_name, "arguments": arguments}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        return await self.connection.call_tool(tool_name, arguments)
+
+    def close(self):
+        self._file.close()
+
+
 def create_connection(
     transport: str,
     command: str = None,
@@ -116,6 +511,7 @@ def create_connection(
     env: dict[str, str] = None,
     url: str = None,
     headers: dict[str, str] = None,
+    result_cache: ToolResultCache = None,
 ) -> MCPConnection:
     """Factory function to create the appropriate MCP connection.
 
@@ -126,6 +522,7 @@ def create_connection(
         env: Environment variables (stdio only)
         url: Server URL (sse and http only)
         headers: HTTP headers (sse and http only)
+        result_cache: Optional tool result cache (all transports)
 
     Returns:
         MCPConnection instance
@@ -135,17 +532,74 @@ def create_connection(
     if transport == "stdio":
         if not command:
             raise ValueError("Command is required for stdio transport")
-        return MCPConnectionStdio(command=command, args=args, env=env)
+        return MCPConnectionStdio(command=command, args=args, env=env, result_cache=result_cache)
 
     elif transport == "sse":
         if not url:
             raise ValueError("URL is required for sse transport")
-        return MCPConnectionSSE(url=url, headers=headers)
+        return MCPConnectionSSE(url=url, headers=headers, result_cache=result_cache)
 
     elif transport in ["http", "streamable_http", "streamable-http"]:
         if not url:
             raise ValueError("URL is required for http transport")
-        return MCPConnectionHTTP(url=url, headers=headers)
+        return MCPConnectionHTTP(url=url, headers=headers, result_cache=result_cache)
 
     else:
         raise ValueError(f"Unsupported transport type: {transport}. Use 'stdio', 'sse', or 'http'")
+
+
+def create_connection_pool(
+    size: int,
+    health_check_interval: float = 30.0,
+    result_cache: ToolResultCache = None,
+    **connection_kwargs: Any,
+) -> MCPConnectionPool:
+    """Factory function to create a pool of MCP connections.
+
+    Args:
+        size: Number of server sessions (for stdio, server processes)
+        health_check_interval: Seconds between pings of each session
+        result_cache: Optional tool result cache shared by all sessions
+        **connection_kwargs: Arguments for create_connection
+
+    Returns:
+        MCPConnectionPool instance
+    """
+    # Validate the connection arguments before any session is started
+    create_connection(**connection_kwargs)
+    return MCPConnectionPool(
+        lambda: create_connection(**connection_kwargs),
+        size=size,
+        health_check_interval=health_check_interval,
+        result_cache=result_cache,
+    )
+
+
+def parse_headers(header_list: list[str]) -> dict[str, str]:
+    """Parse header strings in format 'Key: Value' into a dictionary."""
+    headers = {}
+    if not header_list:
+        return headers
+
+    for header in header_list:
+        if ":" in header:
+            key, value = header.split(":", 1)
+            headers[key.strip()] = value.strip()
+        else:
+            print(f"Warning: Ignoring malformed header: {header}")
+    return headers
+
+
+def parse_env_vars(env_list: list[str]) -> dict[str, str]:
+    """Parse environment variable strings in format 'KEY=VALUE' into a dictionary."""
+    env = {}
+    if not env_list:
+        return env
+
+    for env_var in env_list:
+        if "=" in env_var:
+            key, value = env_var.split("=", 1)
+            env[key.strip()] = value.strip()
+        else:
+            print(f"Warning: Ignoring malformed environment variable: {env_var}")
+    return env
@@ -11,12 +11,23 @@ import sys
 import time
 import traceback
 import xml.etree.ElementTree as ET
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
-from anthropic import Anthropic
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 
-from connections import create_connection
+from connections import (
+    ToolCallRecorder,
+    ToolResultCache,
+    create_connection,
+    create_connection_pool,
+    parse_env_vars,
+    parse_headers,
+)
+from latency import latency_stats
+from response_cache import CACHE_MODES, ResponseCache
 
 EVALUATION_PROMPT = """You are an AI assistant with access to tools.
 
@@ -52,30 +63,67 @@ Response Requirements:
 - For names or text, provide the exact text requested
 - Your response should go last"""
 
+DEFAULT_MAX_CONNECTIONS = 100
 
-def parse_evaluation_file(file_path: Path) -> list[dict[str, Any]]:
-    """Parse XML evaluation file with qa_pair elements."""
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        evaluations = []
 
-        for qa_pair in root.findall(".//qa_pair"):
-            question_elem = qa_pair.find("question")
-            answer_elem = qa_pair.find("answer")
+def create_client(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> AsyncAnthropic:
+    """Create an async Anthropic client backed by one pooled HTTP connection pool.
+
+    All evaluation tasks share this client, so ``max_connections`` bounds the
+    number of in-flight model requests without tying up a thread per request.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+    )
+    return AsyncAnthropic(http_client=DefaultAsyncHttpxClient(limits=limits))
+
+
+def iter_evaluation_file(file_path: Path) -> Iterator[dict[str, Any]]:
+    """Yield QA pairs from an XML evaluation file as they are parsed.
+
+    Uses iterparse and detaches each qa_pair from its parent once it has been
+    read, so memory stays flat regardless of file size. A parse error raises
+    ET.ParseError even after pairs have been yielded, so a malformed file is
+    never mistaken for a shorter one.
+    """
+    stack = []
+    for event, elem in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if elem.tag != "qa_pair":
+            continue
 
-            if question_elem is not None and answer_elem is not None:
-                evaluations.append({
-                    "question": (question_elem.text or "").strip(),
-                    "answer": (answer_elem.text or "").strip(),
-                })
+        question_elem = elem.find("question")
+        answer_elem = elem.find("answer")
+        qa_pair = None
+        if question_elem is not None and answer_elem is not None:
+            qa_pair = {
+                "question": (question_elem.text or "").strip(),
+                "answer": (answer_elem.text or "").strip(),
+            }
 
-        return evaluations
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+        if qa_pair is not None:
+            yield qa_pair
+
+
+def parse_evaluation_file(file_path: Path) -> list[dict[str, Any]]:
+    """Parse XML evaluation file with qa_pair elements."""
+    try:
+        return list(iter_evaluation_file(file_path))
     except Exception as e:
         print(f"Error parsing evaluation file {file_path}: {e}")
         return []
 
 
+
 def extract_xml_content(text: str, tag: str) -> str | None:
     """Extract content from XML tags."""
     pattern = rf"<{tag}>(.*?)</{tag}>"
@@ -83,93 +131,212 @@ def extract_xml_content(text: str, tag: str) -> str | None:
     return matches[-1].strip() if matches else None
 
 
+async def execute_tool(connection: Any, tool_use: Any) -> tuple[str, float]:
+    """Execute one tool_use block, returning the tool response text and its duration."""
+    tool_name = tool_use.name
+    tool_start_ts = time.perf_counter()
+    try:
+        tool_result = await connection.call_tool(tool_name, tool_use.input)
+        tool_response = json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
+    except Exception as e:
+        tool_response = f"Error executing tool {tool_name}: {str(e)}\n"
+        tool_response += traceback.format_exc()
+    return tool_response, time.perf_counter() - tool_start_ts
+
+
+async def create_message(
+    client: AsyncAnthropic,
+    response_cache: ResponseCache | None,
+    **request: Any,
+) -> tuple[Any, dict[str, Any]]:
+    """Send a model request and return the response with its call metrics.
+
+    The response is streamed so time to first token can be measured. Responses
+    served from the response cache are marked ``cached`` and have no TTFT.
+    """
+    start = time.perf_counter()
+    ttft = None
+    fetched = False
+
+    async def fetch():
+        nonlocal ttft, fetched
+        fetched = True
+        async with client.messages.stream(**request) as stream:
+            async for event in stream:
+                if ttft is None and event.type == "content_block_delta":
+                    ttft = time.perf_counter() - start
+            return await stream.get_final_message()
+
+    if response_cache is None:
+        response = await fetch()
+    else:
+        response = await response_cache.create(request, fetch)
+
+    return response, {
+        "duration": time.perf_counter() - start,
+        "ttft": ttft,
+        "input_tokens": response.usage.input_tokens,
+        "output_tokens": response.usage.output_tokens,
+        "cache_read_input_tokens": getattr(response.usage, "cache_read_input_tokens", None) or 0,
+        "cache_creation_input_tokens": getattr(response.usage, "cache_creation_input_tokens", None) or 0,
+        "cached": not fetched,
+    }
+
+
+CACHE_BREAKPOINT = {"type": "ephemeral"}
+
+
+def with_cache_breakpoints(system: str, tools: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Return system prompt blocks and tool schemas marked as prompt-cache breakpoints.
+
+    Tools are rendered before the system prompt, so the breakpoint on the
+    last tool caches the tool schemas and the one on the system prompt
+    caches both.
+    """
+    system_blocks = [{"type": "text", "text": system, "cache_control": CACHE_BREAKPOINT}]
+    cached_tools = [dict(tool) for tool in tools]
+    if cached_tools:
+        cached_tools[-1]["cache_control"] = CACHE_BREAKPOINT
+    return system_blocks, cached_tools
+
+
+def trim_tool_results(tool_results: list[dict[str, Any]], max_chars: int) -> int:
+    """Truncate tool result blocks longer than ``max_chars`` in place; return how many were trimmed.
+
+    Call this exactly once per turn's results, after the model has responded
+    to them. A trimmed block including its truncation notice is still longer
+    than ``max_chars``, so trimming it again would cut into the notice.
+    """
+    trimmed = 0
+    for block in tool_results:
+        content = block.get("content")
+        if isinstance(content, str) and len(content) > max_chars:
+            block["content"] = f"{content[:max_chars]}\n[... {len(content) - max_chars} characters truncated ...]"
+            trimmed += 1
+    return trimmed
+
+
 async def agent_loop(
-    client: Anthropic,
+    client: AsyncAnthropic,
     model: str,
     question: str,
     tools: list[dict[str, Any]],
     connection: Any,
-) -> tuple[str, dict[str, Any]]:
-    """Run the agent loop with MCP tools."""
+    response_cache: ResponseCache | None = None,
+    prompt_cache: bool = True,
+    max_tool_result_chars: int | None = None,
+) -> tuple[str, dict[str, Any], list[dict[str, Any]]]:
+    """Run the agent loop with MCP tools.
+
+    All tool_use blocks in a model turn are executed concurrently and their
+    results are returned to the model in a single user message. Returns the
+    final response text, per-tool metrics and per-model-call metrics.
+
+    With ``prompt_cache``, the tools, the system prompt and the newest tool
+    results carry cache breakpoints. Each turn then only pays full price for
+    the new part of the conversation. With ``max_tool_result_chars``, each
+    turn's tool results are truncated to that length once, when the next
+    turn's results arrive. The trimmed results then get their own breakpoint,
+    so the trimmed prefix is cached and stays unchanged for later turns.
+    """
     messages = [{"role": "user", "content": question}]
+    request = {
+        "model": model,
+        "max_tokens": 4096,
+        "system": EVALUATION_PROMPT,
+        "tools": tools,
+    }
+    if prompt_cache:
+        request["system"], request["tools"] = with_cache_breakpoints(EVALUATION_PROMPT, tools)
+    previous_results = None
+    breakpoints = []
 
-    response = await asyncio.to_thread(
-        client.messages.create,
-        model=model,
-        max_tokens=4096,
-        system=EVALUATION_PROMPT,
-        messages=messages,
-        tools=tools,
-    )
+    response, call_metrics = await create_message(client, response_cache, messages=messages, **request)
+    model_calls = [call_metrics]
 
     messages.append({"role": "assistant", "content": response.content})
 
     tool_metrics = {}
 
     while response.stop_reason == "tool_use":
-        tool_use = next(block for block in response.content if block.type == "tool_use")
-        tool_name = tool_use.name
-        tool_input = tool_use.input
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        outcomes = await asyncio.gather(*(execute_tool(connection, tool_use) for tool_use in tool_uses))
 
-        tool_start_ts = time.time()
-        try:
-            tool_result = await connection.call_tool(tool_name, tool_input)
-            tool_response = json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
-        except Exception as e:
-            tool_response = f"Error executing tool {tool_name}: {str(e)}\n"
-            tool_response += traceback.format_exc()
-        tool_duration = time.time() - tool_start_ts
-
-        if tool_name not in tool_metrics:
-            tool_metrics[tool_name] = {"count": 0, "durations": []}
-        tool_metrics[tool_name]["count"] += 1
-        tool_metrics[tool_name]["durations"].append(tool_duration)
-
-        messages.append({
-            "role": "user",
-            "content": [{
+        tool_results = []
+        for tool_use, (tool_response, tool_duration) in zip(tool_uses, outcomes):
+            if tool_use.name not in tool_metrics:
+                tool_metrics[tool_use.name] = {"count": 0, "durations": []}
+            tool_metrics[tool_use.name]["count"] += 1
+            tool_metrics[tool_use.name]["durations"].append(tool_duration)
+
+            tool_results.append({
                 "type": "tool_result",
                 "tool_use_id": tool_use.id,
                 "content": tool_response,
-            }]
-        })
-
-        response = await asyncio.to_thread(
-            client.messages.create,
-            model=model,
-            max_tokens=4096,
-            system=EVALUATION_PROMPT,
-            messages=messages,
-            tools=tools,
-        )
+            })
+
+        trimming = bool(max_tool_result_chars and previous_results)
+        if trimming:
+            # The model has now responded to the previous turn's results;
+            # they leave the newest turn and are trimmed, exactly once
+            trim_tool_results(previous_results, max_tool_result_chars)
+        if prompt_cache:
+            # Move the conversation breakpoint to the newest results; earlier
+            # prefixes stay cached and are matched automatically. Trimming
+            # rewrites the previous results, so they get a breakpoint too:
+            # the next request then reads the trimmed prefix from the cache
+            for block in breakpoints:
+                del block["cache_control"]
+            breakpoints = [previous_results[-1]] if trimming else []
+            breakpoints.append(tool_results[-1])
+            for block in breakpoints:
+                block["cache_control"] = CACHE_BREAKPOINT
+
+        previous_results = tool_results
+        messages.append({"role": "user", "content": tool_results})
+
+        response, call_metrics = await create_message(client, response_cache, messages=messages, **request)
+        model_calls.append(call_metrics)
         messages.append({"role": "assistant", "content": response.content})
 
     response_text = next(
         (block.text for block in response.content if hasattr(block, "text")),
         None,
     )
-    return response_text, tool_metrics
+    return response_text, tool_metrics, model_calls
 
 
 async def evaluate_single_task(
-    client: Anthropic,
+    client: AsyncAnthropic,
     model: str,
     qa_pair: dict[str, Any],
     tools: list[dict[str, Any]],
     connection: Any,
     task_index: int,
+    response_cache: ResponseCache | None = None,
+    prompt_cache: bool = True,
+    max_tool_result_chars: int | None = None,
 ) -> dict[str, Any]:
     """Evaluate a single QA pair with the given tools."""
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     print(f"Task {task_index + 1}: Running task with question: {qa_pair['question']}")
-    response, tool_metrics = await agent_loop(client, model, qa_pair["question"], tools, connection)
+    response, tool_metrics, model_calls = await agent_loop(
+        client,
+        model,
+        qa_pair["question"],
+        tools,
+        connection,
+        response_cache,
+        prompt_cache=prompt_cache,
+        max_tool_result_chars=max_tool_result_chars,
+    )
 
     response_value = extract_xml_content(response, "response")
     summary = extract_xml_content(response, "summary")
     feedback = extract_xml_content(response, "feedback")
 
-    duration_seconds = time.time() - start_time
+    duration_seconds = time.perf_counter() - start_time
 
     return {
         "question": qa_pair["question"],
@@ -179,6 +346,12 @@ async def evaluate_single_task(
         "total_duration": duration_seconds,
         "tool_calls": tool_metrics,
         "num_tool_calls": sum(len(metrics["durations"]) for metrics in tool_metrics.values()),
+        "model_calls": model_calls,
+        "input_tokens": sum(call["input_tokens"] for call in model_calls),
+        "output_tokens": sum(call["output_tokens"] for call in model_calls),
+        "cache_read_input_tokens": sum(call["cache_read_input_tokens"] for call in model_calls),
+        "cache_creation_input_tokens": sum(call["cache_creation_input_tokens"] for call in model_calls),
+        "ttft": model_calls[0]["ttft"],
         "summary": summary,
         "feedback": feedback,
     }
@@ -193,10 +366,20 @@ REPORT_HEADER = """
 - **Average Task Duration**: {average_duration_s:.2f}s
 - **Average Tool Calls per Task**: {average_tool_calls:.2f}
 - **Total Tool Calls**: {total_tool_calls}
+- **Wall Clock Time**: {wall_clock_s:.2f}s (summed task time {summed_task_s:.2f}s, {speedup:.2f}x speedup, {parallel_efficiency:.1f}% parallel efficiency at concurrency {concurrency})
+- **Tokens**: {input_tokens} in / {output_tokens} out (prompt cache: {cache_read_input_tokens} read, {cache_creation_input_tokens} written){extra_summary}
+
+## Latency
+
+| Operation | Calls | p50 | p90 | p99 | Max |
+|-----------|-------|-----|-----|-----|-----|
+{latency_rows}
 
 ---
 """
 
+LATENCY_ROW = "| {name} | {count} | {p50:.3f}s | {p90:.3f}s | {p99:.3f}s | {max:.3f}s |"
+
 TASK_TEMPLATE = """
 ### Task {task_num}
 
@@ -205,6 +388,9 @@ TASK_TEMPLATE = """
 **Actual Answer**: `{actual_answer}`
 **Correct**: {correct_indicator}
 **Duration**: {total_duration:.2f}s
+**Time to First Token**: {ttft}
+**Tokens**: {input_tokens} in / {output_tokens} out
+**Prompt Tokens per Turn**: {turn_tokens}
 **Tool Calls**: {tool_calls}
 
 **Summary**
@@ -217,27 +403,206 @@ TASK_TEMPLATE = """
 """
 
 
+def turn_prompt_tokens(call: dict[str, Any]) -> int:
+    """Total prompt size of one model call: uncached input plus cache reads and writes."""
+    return call["input_tokens"] + call["cache_read_input_tokens"] + call["cache_creation_input_tokens"]
+
+
+def format_turn_tokens(model_calls: list[dict[str, Any]]) -> str:
+    """Format the prompt size of each turn, with the part read from the prompt cache."""
+    turns = []
+    for call in model_calls:
+        turn = str(turn_prompt_tokens(call))
+        if call["cache_read_input_tokens"]:
+            turn += f" ({call['cache_read_input_tokens']} cached)"
+        turns.append(turn)
+    return ", ".join(turns)
+
+
+def build_metrics(
+    results: list[dict[str, Any]],
+    wall_clock_s: float,
+    concurrency: int,
+    response_cache: ResponseCache | None = None,
+    connection: Any = None,
+) -> dict[str, Any]:
+    """Aggregate per-task results into machine-readable run metrics.
+
+    Model call latencies only include calls that reached the API; responses
+    replayed from the response cache are counted separately.
+    """
+    summed_task_s = sum(r["total_duration"] for r in results)
+    speedup = summed_task_s / wall_clock_s if wall_clock_s > 0 else 0.0
+
+    live_calls = [call for r in results for call in r["model_calls"] if not call["cached"]]
+    tool_durations = {}
+    for r in results:
+        for name, metrics in r["tool_calls"].items():
+            tool_durations.setdefault(name, []).extend(metrics["durations"])
+
+    metrics = {
+        "summary": {
+            "tasks": len(results),
+            "correct": sum(r["score"] for r in results),
+            "wall_clock_s": wall_clock_s,
+            "summed_task_s": summed_task_s,
+            "speedup": speedup,
+            "concurrency": concurrency,
+            "parallel_efficiency": speedup / max(1, min(concurrency, len(results))) if results else 0.0,
+            "input_tokens": sum(r["input_tokens"] for r in results),
+            "cache_read_input_tokens": sum(r["cache_read_input_tokens"] for r in results),
+            "cache_creation_input_tokens": sum(r["cache_creation_input_tokens"] for r in results),
+            "output_tokens": sum(r["output_tokens"] for r in results),
+            "model_calls": sum(len(r["model_calls"]) for r in results),
+            "cached_model_calls": sum(call["cached"] for r in results for call in r["model_calls"]),
+            "tool_calls": sum(r["num_tool_calls"] for r in results),
+        },
+        "latency": {
+            "model": latency_stats([call["duration"] for call in live_calls]),
+            "model_ttft": latency_stats([call["ttft"] for call in live_calls if call["ttft"] is not None]),
+            "tools": {name: latency_stats(durations) for name, durations in sorted(tool_durations.items())},
+        },
+        "tasks": [
+            {
+                "task": i + 1,
+                "question": r["question"],
+                "expected": r["expected"],
+                "actual": r["actual"],
+                "score": r["score"],
+                "duration_s": r["total_duration"],
+                "ttft_s": r["ttft"],
+                "input_tokens": r["input_tokens"],
+                "prompt_tokens_per_turn": [turn_prompt_tokens(call) for call in r["model_calls"]],
+                "output_tokens": r["output_tokens"],
+                "num_tool_calls": r["num_tool_calls"],
+                "model_calls": r["model_calls"],
+                "tool_calls": r["tool_calls"],
+            }
+            for i, r in enumerate(results)
+        ],
+    }
+
+    if response_cache is not None:
+        metrics["response_cache"] = response_cache.stats()
+    result_cache = getattr(connection, "result_cache", None)
+    if result_cache is not None:
+        metrics["tool_result_cache"] = result_cache.stats()
+    if hasattr(connection, "session_stats"):
+        metrics["sessions"] = connection.session_stats()
+    return metrics
+
+
+def format_latency_rows(latency: dict[str, Any]) -> str:
+    """Format the latency table rows of the report."""
+    rows = [("Model call", latency["model"]), ("Model TTFT", latency["model_ttft"])]
+    rows += [(f"Tool `{name}`", stats) for name, stats in latency["tools"].items()]
+    return "\n".join(LATENCY_ROW.format(name=name, **stats) for name, stats in rows if stats["count"])
+
+
+def format_cache_summary(response_cache: ResponseCache | None, result_cache: ToolResultCache | None = None) -> str:
+    """Format the cache lines of the report summary."""
+    lines = ""
+    if response_cache is not None:
+        stats = response_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        lines += (
+            f"\n- **Model Response Cache** ({stats['mode']}): "
+            f"{stats['hits']}/{lookups} hits ({stats['hit_rate'] * 100:.1f}%), {stats['writes']} recorded"
+        )
+    if result_cache is not None:
+        stats = result_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        lines += (
+            f"\n- **Tool Result Cache**: {stats['hits']}/{lookups} hits ({stats['hit_rate'] * 100:.1f}%), "
+            f"{stats['evictions']} evicted, {stats['expirations']} expired"
+        )
+    return lines
+
+
+def format_pool_summary(connection: Any) -> str:
+    """Format per-session load stats when the connection is a pool."""
+    if not hasattr(connection, "session_stats"):
+        return ""
+    lines = "\n- **MCP Sessions**:"
+    for stats in connection.session_stats():
+        lines += (
+            f"\n  - Session {stats['session']}: {stats['calls']} calls, {stats['errors']} errors, "
+            f"max {stats['max_in_flight']} in flight, {stats['busy_seconds']:.2f}s busy, "
+            f"{stats['restarts']} restarts"
+        )
+    return lines
+
+
 async def run_evaluation(
     eval_path: Path,
     connection: Any,
     model: str = "claude-3-7-sonnet-20250219",
+    concurrency: int = 1,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    response_cache: ResponseCache | None = None,
+    metrics_path: Path | None = None,
+    prompt_cache: bool = True,
+    max_tool_result_chars: int | None = None,
 ) -> str:
-    """Run evaluation with MCP server tools."""
+    """Run evaluation with MCP server tools.
+
+    Up to ``concurrency`` tasks run at the same time. Results are reported in
+    the order of the evaluation file regardless of completion order. Model
+    responses go through ``response_cache`` when one is given. Run metrics are
+    written as JSON to ``metrics_path`` when one is given. ``prompt_cache`` and
+    ``max_tool_result_chars`` are passed to agent_loop. A malformed evaluation
+    file raises ET.ParseError instead of producing a partial report.
+    """
     print("🚀 Starting Evaluation")
 
-    client = Anthropic()
-
     tools = await connection.list_tools()
     print(f"📋 Loaded {len(tools)} tools from MCP server")
 
-    qa_pairs = parse_evaluation_file(eval_path)
-    print(f"📋 Loaded {len(qa_pairs)} evaluation tasks")
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_task(i: int, qa_pair: dict[str, Any]) -> dict[str, Any]:
+        # The slot is acquired before the task is created and timing starts
+        # inside evaluate_single_task, so waiting for a slot is not counted
+        print(f"Processing task {i + 1}")
+        return await evaluate_single_task(
+            client,
+            model,
+            qa_pair,
+            tools,
+            connection,
+            i,
+            response_cache,
+            prompt_cache=prompt_cache,
+            max_tool_result_chars=max_tool_result_chars,
+        )
 
-    results = []
-    for i, qa_pair in enumerate(qa_pairs):
-        print(f"Processing task {i + 1}/{len(qa_pairs)}")
-        result = await evaluate_single_task(client, model, qa_pair, tools, connection, i)
-        results.append(result)
+    wall_start = time.perf_counter()
+    async with create_client(max_connections) as client:
+        # Tasks start while the rest of the file is still being read; waiting
+        # for a free slot before reading on keeps at most `concurrency` pairs
+        # in flight
+        tasks = []
+        try:
+            for i, qa_pair in enumerate(iter_evaluation_file(eval_path)):
+                await semaphore.acquire()
+                task = asyncio.create_task(run_task(i, qa_pair))
+                # A done callback also fires for tasks cancelled before they start
+                task.add_done_callback(lambda _: semaphore.release())
+                tasks.append(task)
+            print(f"📋 Loaded {len(tasks)} evaluation tasks")
+            results = await asyncio.gather(*tasks)
+        finally:
+            # If a task or the file reader failed, cancel the remaining tasks
+            # and wait for them so none keeps using the client after it closes
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    wall_clock_s = time.perf_counter() - wall_start
+
+    metrics = build_metrics(results, wall_clock_s, concurrency, response_cache, connection)
+    if metrics_path:
+        metrics_path.write_text(json.dumps(metrics, indent=2, ensure_ascii=False))
+        print(f"📊 Metrics saved to {metrics_path}")
 
     correct = sum(r["score"] for r in results)
     accuracy = (correct / len(results)) * 100 if results else 0
@@ -252,56 +617,44 @@ async def run_evaluation(
         average_duration_s=average_duration_s,
         average_tool_calls=average_tool_calls,
         total_tool_calls=total_tool_calls,
+        wall_clock_s=wall_clock_s,
+        summed_task_s=metrics["summary"]["summed_task_s"],
+        speedup=metrics["summary"]["speedup"],
+        parallel_efficiency=metrics["summary"]["parallel_efficiency"] * 100,
+        concurrency=concurrency,
+        input_tokens=metrics["summary"]["input_tokens"],
+        cache_read_input_tokens=metrics["summary"]["cache_read_input_tokens"],
+        cache_creation_input_tokens=metrics["summary"]["cache_creation_input_tokens"],
+        output_tokens=metrics["summary"]["output_tokens"],
+        latency_rows=format_latency_rows(metrics["latency"]),
+        extra_summary=(
+            format_cache_summary(response_cache, getattr(connection, "result_cache", None))
+            + format_pool_summary(connection)
+        ),
     )
 
     report += "".join([
         TASK_TEMPLATE.format(
             task_num=i + 1,
-            question=qa_pair["question"],
-            expected_answer=qa_pair["answer"],
+            question=result["question"],
+            expected_answer=result["expected"],
             actual_answer=result["actual"] or "N/A",
             correct_indicator="✅" if result["score"] else "❌",
             total_duration=result["total_duration"],
+            ttft=f"{result['ttft']:.2f}s" if result["ttft"] is not None else "N/A",
+            input_tokens=result["input_tokens"],
+            turn_tokens=format_turn_tokens(result["model_calls"]),
+            output_tokens=result["output_tokens"],
             tool_calls=json.dumps(result["tool_calls"], indent=2),
             summary=result["summary"] or "N/A",
             feedback=result["feedback"] or "N/A",
         )
-        for i, (qa_pair, result) in enumerate(zip(qa_pairs, results))
+        for i, result in enumerate(results)
     ])
 
     return report
 
 
-def parse_headers(header_list: list[str]) -> dict[str, str]:
-    """Parse header strings in format 'Key: Value' into a dictionary."""
-    headers = {}
-    if not header_list:
-        return headers
-
-    for header in header_list:
-        if ":" in header:
-            key, value = header.split(":", 1)
-            headers[key.strip()] = value.strip()
-        else:
-            print(f"Warning: Ignoring malformed header: {header}")
-    return headers
-
-
-def parse_env_vars(env_list: list[str]) -> dict[str, str]:
-    """Parse environment variable strings in format 'KEY=VALUE' into a dictionary."""
-    env = {}
-    if not env_list:
-        return env
-
-    for env_var in env_list:
-        if "=" in env_var:
-            key, value = env_var.split("=", 1)
-            env[key.strip()] = value.strip()
-        else:
-            print(f"Warning: Ignoring malformed environment variable: {env_var}")
-    return env
-
-
 async def main():
     parser = argparse.ArgumentParser(
         description="Evaluate MCP servers using test questions",
@@ -316,6 +669,16 @@ Examples:
 
   # Evaluate an HTTP MCP server with custom model
   python evaluation.py -t http -u https://example.com/mcp -m claude-3-5-sonnet-20241022 eval.xml
+
+  # Run up to 8 tasks concurrently
+  python evaluation.py -t stdio -c python -a my_server.py -j 8 eval.xml
+
+  # Spread tool calls across 4 server processes
+  python evaluation.py -t stdio -c python -a my_server.py -j 16 --pool-size 4 eval.xml
+
+  # Record model responses once, then replay them offline
+  python evaluation.py -t stdio -c python -a my_server.py --response-cache .eval_cache eval.xml
+  python evaluation.py -t stdio -c python -a my_server.py --response-cache .eval_cache --cache-mode replay eval.xml
         """,
     )
 
@@ -333,6 +696,20 @@ Examples:
     remote_group.add_argument("-H", "--header", nargs="+", dest="headers", help="HTTP headers in 'Key: Value' format (sse/http only)")
 
     parser.add_argument("-o", "--output", type=Path, help="Output file for evaluation report (default: stdout)")
+    parser.add_argument("--metrics", type=Path, help="Output file for JSON run metrics (default: <output>.metrics.json when -o is given)")
+    parser.add_argument("-j", "--concurrency", type=int, default=1, help="Number of tasks to run concurrently (default: 1)")
+    parser.add_argument("--no-prompt-cache", action="store_true", help="Don't mark the system prompt, tools and recent tool results for prompt caching")
+    parser.add_argument("--trim-tool-results", type=int, metavar="CHARS", help="Truncate tool results the model has already seen to CHARS characters (default: keep in full)")
+    parser.add_argument("--response-cache", type=Path, help="Directory for recorded model responses (default: disabled)")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default="record", help="Response cache mode: record, replay or refresh (default: record)")
+    parser.add_argument("--tool-cache", action="store_true", help="Cache results of identical read-only tool calls across tasks")
+    parser.add_argument("--tool-cache-ttl", type=float, default=300.0, help="Seconds a cached tool result stays valid (default: 300)")
+    parser.add_argument("--tool-cache-size", type=int, default=1024, help="Maximum number of cached tool results (default: 1024)")
+    parser.add_argument("--cacheable-tools", nargs="+", help="Tools whose results may be cached (default: tools annotated readOnlyHint)")
+    parser.add_argument("--uncacheable-tools", nargs="+", help="Tools whose results are never cached")
+    parser.add_argument("--record-tool-calls", type=Path, help="Append every tool call as JSONL, for replay with loadtest.py")
+    parser.add_argument("--pool-size", type=int, default=1, help="Number of MCP server sessions to spread tool calls across (default: 1)")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS, help=f"HTTP connection pool size for model requests (default: {DEFAULT_MAX_CONNECTIONS})")
 
     args = parser.parse_args()
 
@@ -340,18 +717,34 @@ Examples:
         print(f"Error: Evaluation file not found: {args.eval_file}")
         sys.exit(1)
 
+    response_cache = ResponseCache(args.response_cache, args.cache_mode) if args.response_cache else None
+    metrics_path = args.metrics or (args.output.with_suffix(".metrics.json") if args.output else None)
     headers = parse_headers(args.headers) if args.headers else None
     env_vars = parse_env_vars(args.env) if args.env else None
 
-    try:
-        connection = create_connection(
-            transport=args.transport,
-            command=args.command,
-            args=args.args,
-            env=env_vars,
-            url=args.url,
-            headers=headers,
+    result_cache = None
+    if args.tool_cache:
+        result_cache = ToolResultCache(
+            ttl=args.tool_cache_ttl,
+            max_entries=args.tool_cache_size,
+            cacheable=args.cacheable_tools,
+            uncacheable=args.uncacheable_tools,
         )
+
+    connection_kwargs = {
+        "transport": args.transport,
+        "command": args.command,
+        "args": args.args,
+        "env": env_vars,
+        "url": args.url,
+        "headers": headers,
+    }
+
+    try:
+        if args.pool_size > 1:
+            connection = create_connection_pool(args.pool_size, result_cache=result_cache, **connection_kwargs)
+        else:
+            connection = create_connection(result_cache=result_cache, **connection_kwargs)
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
@@ -360,7 +753,25 @@ Examples:
 
     async with connection:
         print("✅ Connected successfully")
-        report = await run_evaluation(args.eval_file, connection, args.model)
+        recorder = ToolCallRecorder(connection, args.record_tool_calls) if args.record_tool_calls else None
+        try:
+            report = await run_evaluation(
+                args.eval_file,
+                recorder or connection,
+                args.model,
+                concurrency=args.concurrency,
+                max_connections=args.max_connections,
+                response_cache=response_cache,
+                metrics_path=metrics_path,
+                prompt_cache=not args.no_prompt_cache,
+                max_tool_result_chars=args.trim_tool_results,
+            )
+        except ET.ParseError as e:
+            print(f"Error parsing evaluation file {args.eval_file}: {e}")
+            sys.exit(1)
+        finally:
+            if recorder:
+                recorder.close()
 
         if args.output:
             args.output.write_text(report)
@@ -0,0 +1,65 @@
+"""Latency summaries shared by the evaluation harness and the load tester."""
+
+import math
+from typing import Any
+
+# Upper bounds (seconds) of the histogram buckets, roughly log-spaced from 1ms to 10s
+HISTOGRAM_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, math.inf)
+
+
+def latency_stats(durations: list[float]) -> dict[str, float]:
+    """Summarize durations as count, mean, p50/p90/p99 (linear interpolation) and max."""
+    values = sorted(durations)
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+
+    def percentile(p: float) -> float:
+        rank = (len(values) - 1) * p
+        lower = int(rank)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(0.50),
+        "p90": percentile(0.90),
+        "p99": percentile(0.99),
+        "max": values[-1],
+    }
+
+
+def latency_histogram(durations: list[float], bounds: tuple[float, ...] = HISTOGRAM_BOUNDS) -> list[dict[str, Any]]:
+    """Count durations per bucket; each bucket holds values up to and including its bound.
+
+    The overflow bucket's bound is reported as None so the result stays valid JSON.
+    """
+    counts = [0] * len(bounds)
+    for duration in durations:
+        for i, bound in enumerate(bounds):
+            if duration <= bound:
+                counts[i] += 1
+                break
+    return [
+        {"le": None if math.isinf(bound) else bound, "count": count}
+        for bound, count in zip(bounds, counts)
+    ]
+
+
+def format_histogram(histogram: list[dict[str, Any]], width: int = 40) -> str:
+    """Render a histogram as text bars, skipping empty buckets at either end."""
+    counts = [bucket["count"] for bucket in histogram]
+    if not any(counts):
+        return "(no samples)"
+    first = next(i for i, count in enumerate(counts) if count)
+    last = len(counts) - 1 - next(i for i, count in enumerate(reversed(counts)) if count)
+    peak = max(counts)
+    total = sum(counts)
+
+    lines = []
+    for bucket in histogram[first:last + 1]:
+        bound = bucket["le"]
+        label = f"> {histogram[-2]['le']:g}s" if bound is None else f"<= {bound * 1000:g}ms" if bound < 1 else f"<= {bound:g}s"
+        bar = "█" * max(1 if bucket["count"] else 0, round(bucket["count"] / peak * width))
+        lines.append(f"{label:>10} | {bar:<{width}} {bucket['count']} ({bucket['count'] / total * 100:.1f}%)")
+    return "\n".join(lines)
@@ -0,0 +1,351 @@
+"""MCP Server Load Test
+
+This script drives a scripted or recorded sequence of tool calls against an MCP
+server, with no model in the loop, and reports latency, error rate and the
+saturation point.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from connections import create_connection, create_connection_pool, parse_env_vars, parse_headers
+from latency import format_histogram, latency_histogram, latency_stats
+
+DEFAULT_CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+
+
+def load_calls(path: Path) -> list[dict[str, Any]]:
+    """Load tool calls from a JSON array or JSONL file of {"tool": ..., "arguments": {...}} objects.
+
+    Files written by ``evaluation.py --record-tool-calls`` use this format.
+    """
+    text = path.read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        items = json.loads(text)
+    else:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    calls = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or "tool" not in item:
+            raise ValueError(f"Call {i + 1} in {path} has no 'tool' field")
+        calls.append({"tool": item["tool"], "arguments": item.get("arguments") or {}})
+    if not calls:
+        raise ValueError(f"No tool calls found in {path}")
+    return calls
+
+
+async def timed_call(
+    connection: Any,
+    call: dict[str, Any],
+    timeout: float,
+    scheduled: float | None = None,
+) -> tuple[float, str | None]:
+    """Run one tool call and return (latency, error kind or None).
+
+    When ``scheduled`` is given, latency is measured from that time instead of
+    the actual start, so client-side queueing delay is included.
+    """
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        _, is_error = await asyncio.wait_for(
+            connection.call_tool_with_status(call["tool"], call["arguments"]),
+            timeout,
+        )
+        error = "tool_error" if is_error else None
+    except asyncio.TimeoutError:
+        error = "timeout"
+    except Exception as e:
+        error = type(e).__name__
+    return time.perf_counter() - start, error
+
+
+async def run_closed_loop(
+    connection: Any,
+    calls: list[dict[str, Any]],
+    concurrency: int,
+    duration: float,
+    timeout: float,
+) -> list[tuple[float, str | None]]:
+    """Keep ``concurrency`` calls in flight for ``duration`` seconds."""
+    deadline = time.perf_counter() + duration
+    counter = itertools.count()
+    samples = []
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            call = calls[next(counter) % len(calls)]
+            samples.append(await timed_call(connection, call, timeout))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open_loop(
+    connection: Any,
+    calls: list[dict[str, Any]],
+    rps: float,
+    duration: float,
+    timeout: float,
+) -> list[tuple[float, str | None]]:
+    """Start calls at a fixed rate for ``duration`` seconds, regardless of completions.
+
+    Latency is measured from each call's scheduled start, so a server that
+    falls behind shows up as growing latency rather than a lower send rate.
+    """
+    start = time.perf_counter()
+    tasks = []
+    for i in range(max(1, int(rps * duration))):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(timed_call(connection, calls[i % len(calls)], timeout, scheduled)))
+    return list(await asyncio.gather(*tasks))
+
+
+def summarize_step(mode: str, level: float, samples: list[tuple[float, str | None]], elapsed: float) -> dict[str, Any]:
+    """Summarize one load level: throughput, error rate, latency percentiles and histogram."""
+    latencies = [latency for latency, _ in samples]
+    errors = Counter(error for _, error in samples if error)
+    failed = sum(errors.values())
+    return {
+        "mode": mode,
+        "level": level,
+        "requests": len(samples),
+        "elapsed_s": elapsed,
+        "throughput_rps": (len(samples) - failed) / elapsed if elapsed > 0 else 0.0,
+        "error_rate": failed / len(samples) if samples else 0.0,
+        "errors": dict(errors),
+        "latency": latency_stats(latencies),
+        "histogram": latency_histogram(latencies),
+    }
+
+
+def find_saturation(
+    steps: list[dict[str, Any]],
+    max_error_rate: float = 0.01,
+    latency_factor: float = 3.0,
+    min_gain: float = 0.1,
+) -> dict[str, Any] | None:
+    """Return the first load level at which the server stops keeping up, or None.
+
+    A level is saturated when its error rate rises more than ``max_error_rate``
+    above the first level's (so scripted calls that always fail don't count),
+    or when its p99 latency exceeds ``latency_factor`` times the first level's.
+    In concurrency mode, a level is also saturated when throughput grows by
+    less than ``min_gain`` over the previous level. In rps mode, it is
+    saturated when achieved throughput falls below 90% of the target rate.
+    """
+    baseline_p99 = steps[0]["latency"]["p99"] if steps else 0.0
+    baseline_errors = steps[0]["error_rate"] if steps else 0.0
+    previous = None
+    for step in steps:
+        reasons = []
+        if previous is not None and step["error_rate"] - baseline_errors > max_error_rate:
+            reasons.append(f"error rate {step['error_rate'] * 100:.1f}%")
+        if previous is not None and baseline_p99 and step["latency"]["p99"] > baseline_p99 * latency_factor:
+            reasons.append(f"p99 {step['latency']['p99'] * 1000:.1f}ms is over {latency_factor:g}x the baseline")
+        if step["mode"] == "concurrency" and previous is not None:
+            if step["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+                reasons.append(f"throughput grew less than {min_gain * 100:.0f}%")
+        if step["mode"] == "rps" and step["throughput_rps"] < step["level"] * 0.9:
+            reasons.append(f"achieved {step['throughput_rps']:.1f} req/s of {step['level']:g} target")
+        if reasons:
+            return {
+                "level": step["level"],
+                "max_sustainable": previous["level"] if previous else None,
+                "reasons": reasons,
+            }
+        previous = step
+    return None
+
+
+async def run_load_test(
+    connection: Any,
+    calls: list[dict[str, Any]],
+    mode: str,
+    levels: list[float],
+    duration: float = 10.0,
+    timeout: float = 30.0,
+    max_error_rate: float = 0.01,
+    latency_factor: float = 3.0,
+) -> dict[str, Any]:
+    """Run each load level in turn and locate the saturation point."""
+    steps = []
+    for level in levels:
+        label = f"concurrency {level:g}" if mode == "concurrency" else f"{level:g} req/s"
+        print(f"⏱️  Running {label} for {duration:g}s...")
+        start = time.perf_counter()
+        if mode == "concurrency":
+            samples = await run_closed_loop(connection, calls, int(level), duration, timeout)
+        else:
+            samples = await run_open_loop(connection, calls, level, duration, timeout)
+        steps.append(summarize_step(mode, level, samples, time.perf_counter() - start))
+
+    return {
+        "mode": mode,
+        "duration_s": duration,
+        "distinct_calls": len(calls),
+        "steps": steps,
+        "saturation": find_saturation(steps, max_error_rate, latency_factor),
+    }
+
+
+STEP_ROW = "| {level:g} | {requests} | {throughput_rps:.1f} | {error_pct:.1f}% | {p50:.1f} | {p90:.1f} | {p99:.1f} | {max:.1f} |"
+
+
+def format_report(results: dict[str, Any]) -> str:
+    """Format load test results as markdown."""
+    level_name = "Concurrency" if results["mode"] == "concurrency" else "Target req/s"
+    lines = [
+        "# MCP Load Test Report",
+        "",
+        f"- **Mode**: {results['mode']} ({results['duration_s']:g}s per level)",
+        f"- **Scripted Calls**: {results['distinct_calls']} distinct calls, replayed round-robin",
+    ]
+
+    saturation = results["saturation"]
+    if saturation is None:
+        lines.append("- **Saturation Point**: not reached at the tested levels")
+    else:
+        sustainable = saturation["max_sustainable"]
+        lines.append(
+            f"- **Saturation Point**: {saturation['level']:g} ({'; '.join(saturation['reasons'])})"
+            + (f", highest healthy level {sustainable:g}" if sustainable is not None else "")
+        )
+
+    lines += [
+        "",
+        f"| {level_name} | Requests | Throughput (req/s) | Errors | p50 (ms) | p90 (ms) | p99 (ms) | Max (ms) |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for step in results["steps"]:
+        latency = {key: value * 1000 for key, value in step["latency"].items() if key != "count"}
+        lines.append(STEP_ROW.format(
+            level=step["level"],
+            requests=step["requests"],
+            throughput_rps=step["throughput_rps"],
+            error_pct=step["error_rate"] * 100,
+            **latency,
+        ))
+
+    for step in results["steps"]:
+        lines += ["", f"### {level_name} {step['level']:g}", ""]
+        if step["errors"]:
+            lines.append("Errors: " + ", ".join(f"{kind} × {count}" for kind, count in step["errors"].items()))
+            lines.append("")
+        lines += ["```", format_histogram(step["histogram"]), "```"]
+
+    return "\n".join(lines) + "\n"
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Load test MCP servers with scripted tool calls (no model in the loop)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Ramp concurrency against a local stdio server
+  python loadtest.py -t stdio -c python -a my_server.py --concurrency 1 4 16 64 calls.jsonl
+
+  # Fixed request rates against an HTTP server, 30s per level
+  python loadtest.py -t http -u https://example.com/mcp --rps 10 50 100 --duration 30 calls.jsonl
+
+  # Replay the tool calls recorded during an evaluation run
+  python evaluation.py -t stdio -c python -a my_server.py --record-tool-calls calls.jsonl eval.xml
+  python loadtest.py -t stdio -c python -a my_server.py calls.jsonl
+        """,
+    )
+
+    parser.add_argument("calls_file", type=Path, help="JSON array or JSONL file of {\"tool\", \"arguments\"} calls")
+    parser.add_argument("-t", "--transport", choices=["stdio", "sse", "http"], default="stdio", help="Transport type (default: stdio)")
+
+    stdio_group = parser.add_argument_group("stdio options")
+    stdio_group.add_argument("-c", "--command", help="Command to run MCP server (stdio only)")
+    stdio_group.add_argument("-a", "--args", nargs="+", help="Arguments for the command (stdio only)")
+    stdio_group.add_argument("-e", "--env", nargs="+", help="Environment variables in KEY=VALUE format (stdio only)")
+
+    remote_group = parser.add_argument_group("sse/http options")
+    remote_group.add_argument("-u", "--url", help="MCP server URL (sse/http only)")
+    remote_group.add_argument("-H", "--header", nargs="+", dest="headers", help="HTTP headers in 'Key: Value' format (sse/http only)")
+
+    load_group = parser.add_argument_group("load options")
+    levels = load_group.add_mutually_exclusive_group()
+    levels.add_argument("--concurrency", type=int, nargs="+", help=f"Concurrency levels to ramp through (default: {' '.join(map(str, DEFAULT_CONCURRENCY_LEVELS))})")
+    levels.add_argument("--rps", type=float, nargs="+", help="Request rates (req/s) to ramp through, instead of concurrency levels")
+    load_group.add_argument("--duration", type=float, default=10.0, help="Seconds to run each level (default: 10)")
+    load_group.add_argument("--timeout", type=float, default=30.0, help="Per-call timeout in seconds (default: 30)")
+    load_group.add_argument("--pool-size", type=int, default=1, help="Number of MCP server sessions to spread calls across (default: 1)")
+    load_group.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate that marks a level as saturated (default: 0.01)")
+    load_group.add_argument("--latency-factor", type=float, default=3.0, help="p99 growth over the first level that marks saturation (default: 3)")
+
+    parser.add_argument("-o", "--output", type=Path, help="Output file for JSON results (default: none)")
+
+    args = parser.parse_args()
+
+    if not args.calls_file.exists():
+        print(f"Error: Calls file not found: {args.calls_file}")
+        sys.exit(1)
+
+    try:
+        calls = load_calls(args.calls_file)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    mode = "rps" if args.rps else "concurrency"
+    levels = args.rps or args.concurrency or DEFAULT_CONCURRENCY_LEVELS
+    if any(level <= 0 for level in levels):
+        print("Error: Load levels must be positive")
+        sys.exit(1)
+
+    connection_kwargs = {
+        "transport": args.transport,
+        "command": args.command,
+        "args": args.args,
+        "env": parse_env_vars(args.env) if args.env else None,
+        "url": args.url,
+        "headers": parse_headers(args.headers) if args.headers else None,
+    }
+
+    try:
+        if args.pool_size > 1:
+            connection = create_connection_pool(args.pool_size, **connection_kwargs)
+        else:
+            connection = create_connection(**connection_kwargs)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"🔗 Connecting to MCP server via {args.transport}...")
+
+    async with connection:
+        print(f"✅ Connected successfully, replaying {len(calls)} scripted calls")
+        results = await run_load_test(
+            connection,
+            calls,
+            mode,
+            levels,
+            duration=args.duration,
+            timeout=args.timeout,
+            max_error_rate=args.max_error_rate,
+            latency_factor=args.latency_factor,
+        )
+
+    print("\n" + format_report(results))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
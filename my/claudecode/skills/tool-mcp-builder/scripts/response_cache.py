@@ -0,0 +1,105 @@
+"""Content-addressed record/replay cache for model responses.
+
+Each model request is keyed by a SHA-256 digest of the model,
+system prompt, message list, tool schemas and sampling parameters. Responses
+are stored as JSON under ``<cache_dir>/<key[:2]>/<key>.json`` so evaluations
+can be replayed offline and deterministically.
+
+Modes:
+    record:  serve cached responses, call the API on a miss and store the result
+    replay:  serve cached responses only; a miss raises CacheMissError
+    refresh: always call the API and overwrite the cached response
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from anthropic.types import Message
+
+CACHE_MODES = ("record", "replay", "refresh")
+
+
+class CacheMissError(Exception):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Serialize SDK objects (content blocks, messages) for hashing."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ResponseCache:
+    """On-disk cache of model responses keyed by request content."""
+
+    def __init__(self, cache_dir: Path, mode: str = "record"):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported cache mode: {mode}. Use one of {', '.join(CACHE_MODES)}")
+        self.cache_dir = Path(cache_dir)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def key_for(self, request: dict[str, Any]) -> str:
+        """Return the content address of a model request."""
+        payload = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_to_jsonable)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _load(self, key: str) -> Message | None:
+        try:
+            data = json.loads(self._path(key).read_text(encoding="utf-8"))
+            return Message.model_validate(data)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, response: Message):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(response.model_dump(mode="json"), f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.writes += 1
+
+    async def create(self, request: dict[str, Any], fetch: Callable[[], Awaitable[Message]]) -> Message:
+        """Serve a model request from the cache, or await ``fetch()`` depending on mode."""
+        key = self.key_for(request)
+
+        if self.mode != "refresh":
+            cached = self._load(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMissError(f"No recorded response for request {key} in {self.cache_dir}")
+
+        response = await fetch()
+        self._store(key, response)
+        return response
+
+    def stats(self) -> dict[str, Any]:
+        """Return lookup counters for the evaluation report."""
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
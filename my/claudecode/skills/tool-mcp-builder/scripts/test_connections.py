@@ -0,0 +1,42 @@
+"""Tests for in-flight request sharing in the tool result cache."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("mcp")
+
+from connections import ToolCallCancelledError, ToolResultCache  # noqa: E402
+
+
+def test_cancelling_the_owner_does_not_cancel_other_waiters():
+    cache = ToolResultCache(cacheable=["search"])
+    fetches = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def fetch():
+            fetches.append(len(fetches))
+            await release.wait()
+            return "result", False
+
+        owner = asyncio.create_task(cache.call("search", {"q": "x"}, fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.call("search", {"q": "x"}, fetch))
+        await asyncio.sleep(0)
+        assert len(fetches) == 1
+
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        with pytest.raises(ToolCallCancelledError):
+            await waiter
+        assert not waiter.cancelled()
+
+        # The call is not cached and runs again on retry
+        release.set()
+        return await cache.call("search", {"q": "x"}, fetch)
+
+    assert asyncio.run(run()) == "result"
+    assert len(fetches) == 2
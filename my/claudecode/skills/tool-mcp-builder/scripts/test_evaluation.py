@@ -0,0 +1,240 @@
+"""Tests for the evaluation file reader, task scheduling, and tool-result
+trimming with prompt-cache breakpoints in the agent loop."""
+
+import asyncio
+import copy
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("anthropic")
+pytest.importorskip("mcp")
+
+import evaluation  # noqa: E402
+
+TOOL_OUTPUT = "x" * 1000
+MAX_CHARS = 100
+
+
+def tool_turn(index):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="tool_use", id=f"call-{index}", name="fetch", input={})],
+        stop_reason="tool_use",
+        usage=SimpleNamespace(input_tokens=1, output_tokens=1),
+    )
+
+
+def final_turn():
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text="<response>done</response>")],
+        stop_reason="end_turn",
+        usage=SimpleNamespace(input_tokens=1, output_tokens=1),
+    )
+
+
+class FakeStream:
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+    async def get_final_message(self):
+        return self.response
+
+
+class FakeClient:
+    """Replays scripted responses and records the messages of every request."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.messages = self
+
+    def stream(self, **request):
+        self.requests.append(copy.deepcopy(request["messages"]))
+        return FakeStream(self.responses.pop(0))
+
+
+class FakeConnection:
+    async def call_tool(self, tool_name, arguments):
+        return TOOL_OUTPUT
+
+
+def tool_result_blocks(messages):
+    return [
+        block
+        for message in messages
+        if message["role"] == "user" and isinstance(message["content"], list)
+        for block in message["content"]
+    ]
+
+
+def without_breakpoints(messages):
+    messages = copy.deepcopy(messages)
+    for block in tool_result_blocks(messages):
+        block.pop("cache_control", None)
+    return messages
+
+
+def first_breakpoint_message(messages):
+    for index, message in enumerate(messages):
+        if message["role"] == "user" and isinstance(message["content"], list):
+            if any("cache_control" in block for block in message["content"]):
+                return index
+    return None
+
+
+def run_loop(turns, prompt_cache=True):
+    client = FakeClient([tool_turn(i) for i in range(turns)] + [final_turn()])
+    text, _, model_calls = asyncio.run(
+        evaluation.agent_loop(
+            client,
+            "test-model",
+            "question",
+            [{"name": "fetch", "input_schema": {"type": "object"}}],
+            FakeConnection(),
+            prompt_cache=prompt_cache,
+            max_tool_result_chars=MAX_CHARS,
+        )
+    )
+    assert text == "<response>done</response>"
+    assert len(model_calls) == turns + 1
+    return client.requests
+
+
+@pytest.mark.parametrize("turns", [3, 5])
+def test_each_tool_result_is_trimmed_once(turns):
+    requests = run_loop(turns)
+    notice = f"[... {len(TOOL_OUTPUT) - MAX_CHARS} characters truncated ...]"
+
+    for messages in requests[1:]:
+        *seen, newest = tool_result_blocks(messages)
+        assert newest["content"] == TOOL_OUTPUT
+        for block in seen:
+            assert block["content"] == f"{TOOL_OUTPUT[:MAX_CHARS]}\n{notice}"
+            assert block["content"].count("characters truncated") == 1
+
+
+@pytest.mark.parametrize("turns", [3, 5])
+def test_trimmed_prefix_is_stable_under_its_breakpoint(turns):
+    requests = run_loop(turns)
+
+    # Everything up to the trimmed results' breakpoint must be sent unchanged
+    # in the next request, or the prefix cached there could never be read
+    for current, following in zip(requests[2:], requests[3:]):
+        end = first_breakpoint_message(current) + 1
+        assert without_breakpoints(following)[:end] == without_breakpoints(current)[:end]
+
+
+def test_breakpoints_stay_within_api_limit():
+    for messages in run_loop(4)[1:]:
+        marked = [block for block in tool_result_blocks(messages) if "cache_control" in block]
+        # Tools and system prompt use two of the four allowed breakpoints
+        assert 1 <= len(marked) <= 2
+        assert marked[-1] is tool_result_blocks(messages)[-1]
+
+
+def test_trimming_without_prompt_cache_adds_no_breakpoints():
+    for messages in run_loop(3, prompt_cache=False):
+        assert first_breakpoint_message(messages) is None
+
+
+MALFORMED_EVAL = """<evaluation>
+  <qa_pair><question>q1</question><answer>a1</answer></qa_pair>
+  <qa_pair><question>q2</question><answer>a2</answer></qa_pair>
+  <qa_pair><question>q3</answer></qa_pair>
+  <qa_pair><question>q4</question><answer>a4</answer></qa_pair>
+</evaluation>
+"""
+
+
+class NullClient:
+    def __init__(self):
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+        return False
+
+
+class ToolListConnection:
+    async def list_tools(self):
+        return []
+
+
+def test_parse_error_mid_file_is_raised_after_earlier_pairs(tmp_path):
+    path = tmp_path / "eval.xml"
+    path.write_text(MALFORMED_EVAL)
+
+    pairs = evaluation.iter_evaluation_file(path)
+    assert [next(pairs)["question"], next(pairs)["question"]] == ["q1", "q2"]
+    with pytest.raises(ET.ParseError):
+        next(pairs)
+
+
+def test_run_evaluation_fails_on_malformed_file(tmp_path, monkeypatch):
+    path = tmp_path / "eval.xml"
+    path.write_text(MALFORMED_EVAL)
+
+    async def fake_evaluate(client, model, qa_pair, *args, **kwargs):
+        await asyncio.sleep(0)
+        return {}
+
+    monkeypatch.setattr(evaluation, "create_client", lambda max_connections: NullClient())
+    monkeypatch.setattr(evaluation, "evaluate_single_task", fake_evaluate)
+
+    # No report is built from the pairs read before the error
+    with pytest.raises(ET.ParseError):
+        asyncio.run(evaluation.run_evaluation(path, ToolListConnection(), concurrency=4))
+
+
+def test_failing_task_cancels_its_siblings_before_the_client_closes(tmp_path, monkeypatch):
+    path = tmp_path / "eval.xml"
+    path.write_text(
+        "<evaluation>"
+        + "".join(
+            f"<qa_pair><question>q{i}</question><answer>a{i}</answer></qa_pair>"
+            for i in range(4)
+        )
+        + "</evaluation>"
+    )
+    cancelled = []
+
+    async def fake_evaluate(client, model, qa_pair, *args, **kwargs):
+        if qa_pair["question"] == "q0":
+            await asyncio.sleep(0)
+            raise RuntimeError("model request failed")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append((qa_pair["question"], client.closed))
+            raise
+
+    monkeypatch.setattr(evaluation, "create_client", lambda max_connections: NullClient())
+    monkeypatch.setattr(evaluation, "evaluate_single_task", fake_evaluate)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="model request failed"):
+            await evaluation.run_evaluation(path, ToolListConnection(), concurrency=3)
+        # Nothing is left running once run_evaluation has returned
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    # q3 may start in the slot q0 frees before the failure is seen
+    assert {"q1", "q2"} <= {question for question, _ in cancelled}
+    assert not any(closed for _, closed in cancelled)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark for quick_validate
+
+Measures how validation time changes as the SKILL.md body grows, CLI startup
+time, and per-skill validation cost with and without the frontmatter cache.
+
+Usage:
+    python benchmark_validate.py body [--sizes-kb 1 100 1024 ...] [--repeat N]
+    python benchmark_validate.py startup [--repeat N]
+    python benchmark_validate.py per-skill [--skills N]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import quick_validate  # noqa: E402
+from quick_validate import collect_errors, read_frontmatter, validate_skill  # noqa: E402
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+FRONTMATTER = "---\nname: benchmark-skill\ndescription: Synthetic skill used to benchmark validation\n---\n"
+
+
+def legacy_read_frontmatter(skill_md):
+    """Previous implementation: read the whole file, then regex out the frontmatter"""
+    content = skill_md.read_text()
+    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
+    return match.group(1)
+
+
+def write_skill(skill_dir, body_kb):
+    """Create a valid skill whose SKILL.md body is roughly body_kb kilobytes"""
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    line = "Reference material that only matters once the skill is loaded.\n"
+    body = line * max(1, body_kb * 1024 // len(line))
+    (skill_dir / "SKILL.md").write_text(FRONTMATTER + "\n# Benchmark\n\n" + body)
+
+
+def validate_uncached(skill_dir):
+    """validate_skill with an empty frontmatter cache, so every call re-parses"""
+    quick_validate._frontmatter_cache.clear()
+    return validate_skill(skill_dir)
+
+
+def time_per_call(func, arg, repeat):
+    """Return the mean seconds per call of func(arg)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_body(sizes_kb, repeat):
+    """Compare per-skill validation cost across SKILL.md body sizes"""
+    print(f"Repeat: {repeat}\n")
+    print(f"{'body KB':>9} {'whole-file ms':>14} {'streaming ms':>13} {'validate_skill ms':>18}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_kb in sizes_kb:
+            skill_dir = Path(tmp) / f"skill-{size_kb}"
+            write_skill(skill_dir, size_kb)
+            skill_md = skill_dir / "SKILL.md"
+
+            assert legacy_read_frontmatter(skill_md) == read_frontmatter(skill_md), \
+                "Streaming reader disagrees with the whole-file reader"
+            assert validate_skill(skill_dir)[0], "Synthetic skill should be valid"
+
+            legacy = time_per_call(legacy_read_frontmatter, skill_md, repeat)
+            streaming = time_per_call(read_frontmatter, skill_md, repeat)
+            full = time_per_call(validate_uncached, skill_dir, repeat)
+
+            print(f"{size_kb:>9} {legacy * 1e3:>14.3f} {streaming * 1e3:>13.3f} {full * 1e3:>18.3f}")
+
+
+def time_command(args, repeat):
+    """Return the best wall-clock seconds of running a command repeat times"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=SCRIPT_DIR, check=False, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_startup(repeat):
+    """Compare interpreter startup, module import and a one-skill CLI run"""
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as tmp:
+        skill_dir = Path(tmp) / "startup-skill"
+        write_skill(skill_dir, 1)
+
+        rows = [
+            ("python -c pass", [python, "-c", "pass"]),
+            ("import quick_validate", [python, "-c", "import quick_validate"]),
+            ("import yaml + quick_validate", [python, "-c", "import yaml, quick_validate"]),
+            ("quick_validate.py <skill>", [python, "quick_validate.py", str(skill_dir)]),
+        ]
+
+        print(f"Best of {repeat} runs\n")
+        print(f"{'command':<30} {'ms':>8}")
+        for label, args in rows:
+            print(f"{label:<30} {time_command(args, repeat) * 1e3:>8.1f}")
+
+
+def bench_per_skill(count):
+    """Compare per-skill cost of pure-Python YAML, the C loader, and the cache"""
+    yaml, loader = quick_validate._yaml()
+    with tempfile.TemporaryDirectory() as tmp:
+        skills = [Path(tmp) / f"skill-{i}" for i in range(count)]
+        for skill_dir in skills:
+            write_skill(skill_dir, 4)
+
+        start = time.perf_counter()
+        for skill_dir in skills:
+            yaml.safe_load(read_frontmatter(skill_dir / "SKILL.md"))
+        pure = (time.perf_counter() - start) / count
+
+        quick_validate._frontmatter_cache.clear()
+        start = time.perf_counter()
+        for skill_dir in skills:
+            collect_errors(skill_dir)
+        cold = (time.perf_counter() - start) / count
+
+        start = time.perf_counter()
+        for skill_dir in skills:
+            collect_errors(skill_dir)
+        warm = (time.perf_counter() - start) / count
+
+    print(f"Skills: {count}, loader: {loader.__name__}\n")
+    print(f"{'read + yaml.safe_load':<32} {pure * 1e6:>8.1f} us/skill")
+    print(f"{'collect_errors (cold cache)':<32} {cold * 1e6:>8.1f} us/skill")
+    print(f"{'collect_errors (warm cache)':<32} {warm * 1e6:>8.1f} us/skill")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quick_validate")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    body = sub.add_parser("body", help="Validation time as the SKILL.md body grows")
+    body.add_argument(
+        "--sizes-kb",
+        type=int,
+        nargs="+",
+        default=[1, 100, 1024, 10240, 51200],
+        help="SKILL.md body sizes in KB (default: 1 100 1024 10240 51200)",
+    )
+    body.add_argument("--repeat", type=int, default=20, help="Calls per measurement")
+
+    startup = sub.add_parser("startup", help="CLI startup and import time")
+    startup.add_argument("--repeat", type=int, default=10, help="Runs per command")
+
+    per_skill = sub.add_parser("per-skill", help="Per-skill validation cost")
+    per_skill.add_argument("--skills", type=int, default=1000, help="Number of synthetic skills")
+
+    args = parser.parse_args()
+
+    if args.command == "body":
+        bench_body(args.sizes_kb, args.repeat)
+    elif args.command == "startup":
+        bench_startup(args.repeat)
+    elif args.command == "per-skill":
+        bench_per_skill(args.skills)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,54 +4,231 @@ Skill Packager - Creates a distributable .skill file of a skill folder
 
 Usage:
     python utils/package_skill.py <path/to/skill-folder> [output-directory]
+    python utils/package_skill.py package_all <root-or-skill>... [-o output-directory] [-j N]
 
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+    python utils/package_skill.py package_all skills/public -o ./dist
 """
 
+import argparse
+import hashlib
+import json
+import os
+import struct
 import sys
+import tempfile
+import time
 import zipfile
+from collections import namedtuple
 from pathlib import Path
-from quick_validate import validate_skill
+from quick_validate import find_skills, load_frontmatter, validate_skill
 
+# Stored inside the archive as <skill-name>/.skill-manifest.json
+MANIFEST_NAME = '.skill-manifest.json'
 
-def package_skill(skill_path, output_dir=None):
+# Every entry gets the same timestamp (the earliest a zip can store) so that
+# identical content always produces a byte-identical archive
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Outcome of package_skill: path to the .skill file (None on failure),
+# status 'built', 'unchanged' or 'failed', and the error message on failure
+PackageResult = namedtuple('PackageResult', ['path', 'status', 'error'])
+
+
+def collect_files(skill_path):
+    """Return (arcname, path) for every file in the skill, sorted by arcname"""
+    files = []
+    for file_path in skill_path.rglob('*'):
+        if file_path.is_file() and file_path != skill_path / MANIFEST_NAME:
+            arcname = file_path.relative_to(skill_path.parent).as_posix()
+            files.append((arcname, file_path))
+    return sorted(files)
+
+
+def file_mode(file_path):
+    """Normalize permissions to 0o755 for executables and 0o644 otherwise"""
+    return 0o755 if os.stat(file_path).st_mode & 0o111 else 0o644
+
+
+def build_manifest(skill_path, files):
+    """Describe the archive content: SHA-256, size and mode of every file"""
+    entries = {}
+    for arcname, file_path in files:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        entries[arcname] = {
+            'sha256': digest.hexdigest(),
+            'size': file_path.stat().st_size,
+            'mode': file_mode(file_path),
+        }
+    return {'skill': skill_path.name, 'files': entries}
+
+
+def read_manifest(skill_filename, skill_name):
+    """Return the manifest stored in an existing .skill file, or None"""
+    try:
+        with zipfile.ZipFile(skill_filename) as zipf:
+            return json.loads(zipf.read(f"{skill_name}/{MANIFEST_NAME}"))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def _zip_info(arcname, mode, file_size):
+    info = zipfile.ZipInfo(arcname, date_time=FIXED_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.create_system = 3  # Unix, regardless of the building platform
+    info.external_attr = (0o100000 | mode) << 16  # regular file + permissions
+    info.file_size = file_size
+    return info
+
+
+# copy_compressed writes members through undocumented zipfile internals that
+# can change between Python versions; without them it falls back to
+# recompressing, which is slower but produces the same archive
+_RAW_COPY = (
+    all(hasattr(zipfile, name) for name in ('structFileHeader', 'sizeFileHeader', 'ZIP64_LIMIT'))
+    and callable(getattr(zipfile.ZipInfo, 'FileHeader', None))
+)
+
+
+def _can_copy_raw(zipf):
+    return _RAW_COPY and all(hasattr(zipf, name) for name in ('fp', 'start_dir', 'filelist', 'NameToInfo'))
+
+
+def _write_header(zipf, info):
+    # Same zip64 decision ZipFile.open(..., 'w') makes, so copied and freshly
+    # compressed members get identical headers
+    info.header_offset = zipf.fp.tell()
+    zipf.fp.write(info.FileHeader(info.file_size * 1.05 > zipfile.ZIP64_LIMIT))
+
+
+def copy_compressed(old, src, old_info, zipf, info):
+    """
+    Append a member's compressed bytes from an old archive without recompressing.
+
+    old is the old archive as a ZipFile and src the same file opened in binary
+    mode; info describes the new entry and must match the old one's content.
+    If the zipfile internals this relies on are missing, the member is
+    decompressed from old and written again instead.
+    """
+    if not _can_copy_raw(zipf):
+        zipf.writestr(info, old.read(old_info))
+        return
+
+    src.seek(old_info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, src.read(zipfile.sizeFileHeader))
+    name_length, extra_length = header[-2:]
+    src.seek(name_length + extra_length, os.SEEK_CUR)
+    data = src.read(old_info.compress_size)
+
+    info.CRC = old_info.CRC
+    info.compress_size = old_info.compress_size
+    _write_header(zipf, info)
+    zipf.fp.write(data)
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(info)
+    zipf.NameToInfo[info.filename] = info
+
+
+def write_archive(skill_filename, skill_path, files, manifest, previous, verbose=True):
+    """
+    Write the .skill file atomically, reusing compressed members from the
+    previous archive for files whose hash and mode are unchanged.
+
+    Returns the number of reused members.
+    """
+    previous_files = previous['files'] if previous else {}
+    reused = 0
+    fd, tmp = tempfile.mkstemp(dir=skill_filename.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        old = zipfile.ZipFile(skill_filename) if previous_files else None
+        src = open(skill_filename, 'rb') if old else None
+        try:
+            with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for arcname, file_path in files:
+                    entry = manifest['files'][arcname]
+                    info = _zip_info(arcname, entry['mode'], entry['size'])
+                    if previous_files.get(arcname) == entry:
+                        copy_compressed(old, src, old.getinfo(arcname), zipf, info)
+                        reused += 1
+                        if verbose:
+                            print(f"  Reused: {arcname}")
+                    else:
+                        with open(file_path, 'rb') as f, zipf.open(info, 'w') as dest:
+                            for block in iter(lambda: f.read(1024 * 1024), b''):
+                                dest.write(block)
+                        if verbose:
+                            print(f"  Added: {arcname}")
+
+                data = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+                info = _zip_info(f"{skill_path.name}/{MANIFEST_NAME}", 0o644, len(data))
+                zipf.writestr(info, data)
+        finally:
+            if old:
+                old.close()
+                src.close()
+        os.replace(tmp, skill_filename)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return reused
+
+
+def package_skill(skill_path, output_dir=None, verbose=True):
     """
     Package a skill folder into a .skill file.
 
+    Entries are sorted and carry fixed timestamps and normalized permissions,
+    so the same content always yields the same bytes. A content manifest is
+    stored in the archive; if an existing .skill file has the same manifest
+    nothing is rebuilt, otherwise unchanged files are copied over without
+    recompressing.
+
     Args:
         skill_path: Path to the skill folder
         output_dir: Optional output directory for the .skill file (defaults to current directory)
+        verbose: Print progress and errors (bulk packaging turns this off)
 
     Returns:
-        Path to the created .skill file, or None if error
+        PackageResult with the .skill path, 'built' / 'unchanged' / 'failed',
+        and the error message if packaging failed
     """
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    def failed(error, hint=None):
+        log(f"❌ {error}")
+        if hint:
+            log(f"   {hint}")
+        return PackageResult(None, 'failed', error)
+
     skill_path = Path(skill_path).resolve()
 
     # Validate skill folder exists
     if not skill_path.exists():
-        print(f"❌ Error: Skill folder not found: {skill_path}")
-        return None
+        return failed(f"Error: Skill folder not found: {skill_path}")
 
     if not skill_path.is_dir():
-        print(f"❌ Error: Path is not a directory: {skill_path}")
-        return None
+        return failed(f"Error: Path is not a directory: {skill_path}")
 
     # Validate SKILL.md exists
     skill_md = skill_path / "SKILL.md"
     if not skill_md.exists():
-        print(f"❌ Error: SKILL.md not found in {skill_path}")
-        return None
+        return failed(f"Error: SKILL.md not found in {skill_path}")
 
     # Run validation before packaging
-    print("🔍 Validating skill...")
+    log("🔍 Validating skill...")
     valid, message = validate_skill(skill_path)
     if not valid:
-        print(f"❌ Validation failed: {message}")
-        print("   Please fix the validation errors before packaging.")
-        return None
-    print(f"✅ {message}\n")
+        return failed(f"Validation failed: {message}",
+                      "Please fix the validation errors before packaging.")
+    log(f"✅ {message}")
+    # Already parsed during validation; served from the frontmatter cache
+    log(f"   Skill name: {load_frontmatter(skill_md)['name']}\n")
 
     # Determine output location
     skill_name = skill_path.name
@@ -65,29 +242,144 @@ def package_skill(skill_path, output_dir=None):
 
     # Create the .skill file (zip format)
     try:
-        with zipfile.ZipFile(skill_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path within the zip
-                    arcname = file_path.relative_to(skill_path.parent)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
-
-        print(f"\n✅ Successfully packaged skill to: {skill_filename}")
-        return skill_filename
+        files = collect_files(skill_path)
+        manifest = build_manifest(skill_path, files)
+        previous = read_manifest(skill_filename, skill_name)
+        if previous == manifest:
+            log(f"✅ Unchanged since last build, skipping: {skill_filename}")
+            return PackageResult(skill_filename, 'unchanged', None)
+
+        reused = write_archive(skill_filename, skill_path, files, manifest, previous, verbose)
+        if reused:
+            log(f"\n   Reused {reused} of {len(files)} compressed file(s) from the previous build")
+        log(f"\n✅ Successfully packaged skill to: {skill_filename}")
+        return PackageResult(skill_filename, 'built', None)
 
     except Exception as e:
-        print(f"❌ Error creating .skill file: {e}")
-        return None
+        return failed(f"Error creating .skill file: {e}")
+
+
+def expand_skill_paths(paths):
+    """
+    Turn the command-line paths into a sorted list of skill folders.
+
+    A path containing SKILL.md is a skill; any other directory is searched
+    for skills the same way quick_validate's validate_all mode does.
+    """
+    skills = set()
+    for path in paths:
+        path = Path(path).resolve()
+        if (path / "SKILL.md").exists():
+            skills.add(path)
+        else:
+            skills.update(skill.resolve() for skill in find_skills(path))
+    return sorted(skills)
+
+
+def _package_one(skill_path, output_dir):
+    """Package one skill without progress output; used by package_all workers"""
+    start = time.perf_counter()
+    result = package_skill(skill_path, output_dir, verbose=False)
+    return {
+        'skill': skill_path,
+        'status': result.status,
+        'size': result.path.stat().st_size if result.path else 0,
+        'seconds': time.perf_counter() - start,
+        'error': result.error,
+    }
+
+
+def package_all(skill_paths, output_dir, jobs=None):
+    """
+    Package many skills into output_dir, across processes when jobs > 1.
+
+    Returns (results, elapsed_seconds); results are in skill_paths order.
+    """
+    output_dir = Path(output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = min(jobs or os.cpu_count() or 1, len(skill_paths)) or 1
+
+    start = time.perf_counter()
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(_package_one, skill_paths, [output_dir] * len(skill_paths)))
+    else:
+        results = [_package_one(skill_path, output_dir) for skill_path in skill_paths]
+    return results, time.perf_counter() - start
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def print_summary(results, elapsed, jobs):
+    """Print one line per skill followed by timing and size totals"""
+    icons = {'built': "✅", 'unchanged': "⏭️ ", 'failed': "❌"}
+    width = max(len(result['skill'].name) for result in results)
+    for result in results:
+        detail = result['error'] or format_size(result['size'])
+        print(f"{icons[result['status']]} {result['skill'].name:<{width}}  "
+              f"{result['status']:<9}  {result['seconds']:>6.2f}s  {detail}")
+
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in icons}
+    total_size = sum(result['size'] for result in results)
+    busy = sum(result['seconds'] for result in results)
+    print(f"\n📊 {len(results)} skill(s): {counts['built']} built, "
+          f"{counts['unchanged']} unchanged, {counts['failed']} failed")
+    print(f"   Total size: {format_size(total_size)}")
+    print(f"   Wall time: {elapsed:.2f}s with {jobs} worker(s) "
+          f"(sum of per-skill time {busy:.2f}s, speedup {busy / elapsed if elapsed else 0:.1f}x)")
+
+
+def main_package_all(argv):
+    parser = argparse.ArgumentParser(
+        prog='package_skill.py package_all',
+        description='Package every skill under the given roots (or the given skill folders) concurrently',
+    )
+    parser.add_argument('paths', nargs='+', help='Skill folders, or directories to search for skills')
+    parser.add_argument('-o', '--output-dir', default='.', help='Directory for the .skill files (default: current directory)')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    skill_paths = expand_skill_paths(args.paths)
+    if not skill_paths:
+        print("❌ Error: No skills found")
+        sys.exit(1)
+
+    # Archives are named after the folder, so two skills with the same
+    # folder name would overwrite each other in the output directory
+    seen = {}
+    for skill_path in skill_paths:
+        if skill_path.name in seen:
+            print(f"❌ Error: Two skills would both be packaged as {skill_path.name}.skill:")
+            print(f"   {seen[skill_path.name]}\n   {skill_path}")
+            sys.exit(1)
+        seen[skill_path.name] = skill_path
+
+    jobs = min(args.jobs or os.cpu_count() or 1, len(skill_paths))
+    print(f"📦 Packaging {len(skill_paths)} skill(s) into {Path(args.output_dir).resolve()} with {jobs} worker(s)\n")
+
+    results, elapsed = package_all(skill_paths, args.output_dir, jobs)
+    print_summary(results, elapsed, jobs)
+    sys.exit(1 if any(result['status'] == 'failed' for result in results) else 0)
 
 
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == 'package_all':
+        main_package_all(sys.argv[2:])
+
     if len(sys.argv) < 2:
         print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory]")
+        print("       python utils/package_skill.py package_all <root-or-skill>... [-o output-directory] [-j N]")
         print("\nExample:")
         print("  python utils/package_skill.py skills/public/my-skill")
         print("  python utils/package_skill.py skills/public/my-skill ./dist")
+        print("  python utils/package_skill.py package_all skills/public -o ./dist")
         sys.exit(1)
 
     skill_path = sys.argv[1]
@@ -100,7 +392,7 @@ def main():
 
     result = package_skill(skill_path, output_dir)
 
-    if result:
+    if result.status != 'failed':
         sys.exit(0)
     else:
         sys.exit(1)
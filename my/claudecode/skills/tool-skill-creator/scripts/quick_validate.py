@@ -6,90 +6,261 @@ Quick validation script for skills - minimal version
 import sys
 import os
 import re
-import yaml
+import json
+import time
+import argparse
+from functools import lru_cache
 from pathlib import Path
 
-def validate_skill(skill_path):
-    """Basic validation of a skill"""
-    skill_path = Path(skill_path)
+# Define allowed properties
+ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata'}
 
-    # Check SKILL.md exists
-    skill_md = skill_path / 'SKILL.md'
-    if not skill_md.exists():
-        return False, "SKILL.md not found"
+# Directories never searched for skills in validate_all mode
+SKIP_DIRS = {'node_modules', '__pycache__', 'venv'}
+
+# Below this many skills, process startup costs more than validating serially
+PARALLEL_THRESHOLD = 64
+
+# Hard cap on how much of SKILL.md is read while looking for the closing '---'
+MAX_FRONTMATTER_CHARS = 64 * 1024
+
+
+class FrontmatterError(ValueError):
+    """Raised when SKILL.md has no readable frontmatter block"""
+
+
+def read_frontmatter(skill_md, max_chars=MAX_FRONTMATTER_CHARS):
+    """
+    Return the text between the opening and closing '---' of a SKILL.md.
+
+    Reads line by line and stops at the closing delimiter, so the size of the
+    body after the frontmatter does not matter. Gives up with FrontmatterError
+    once more than max_chars have been read.
+    """
+    with open(skill_md) as f:
+        first = f.readline(max_chars + 1)
+        if not first.startswith('---'):
+            raise FrontmatterError("No YAML frontmatter found")
+        if first != '---\n':
+            raise FrontmatterError("Invalid frontmatter format")
+
+        lines = []
+        remaining = max_chars - len(first)
+        while True:
+            line = f.readline(remaining + 1)
+            if not line:
+                raise FrontmatterError("Invalid frontmatter format")
+            # The closing delimiter must follow a newline, so it cannot be
+            # the line directly after the opening one
+            if lines and line.startswith('---'):
+                return ''.join(lines)[:-1]
+            remaining -= len(line)
+            if remaining < 0:
+                raise FrontmatterError(
+                    f"Frontmatter exceeds {max_chars} characters without a closing '---'"
+                )
+            lines.append(line)
 
-    # Read and validate frontmatter
-    content = skill_md.read_text()
-    if not content.startswith('---'):
-        return False, "No YAML frontmatter found"
 
-    # Extract frontmatter
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if not match:
-        return False, "Invalid frontmatter format"
+@lru_cache(maxsize=None)
+def _yaml():
+    """Import PyYAML on first use and pick the libyaml-backed loader if it was built"""
+    import yaml
+    return yaml, getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
-    frontmatter_text = match.group(1)
 
-    # Parse YAML frontmatter
+# Parsed frontmatter by absolute SKILL.md path: (mtime_ns, size, result)
+_frontmatter_cache = {}
+
+
+def load_frontmatter(skill_md):
+    """
+    Return the parsed frontmatter of a SKILL.md as a dict.
+
+    Results are cached per path and reused while the file's mtime and size are
+    unchanged, so validating and then packaging a skill parses it once.
+    Raises FrontmatterError (errors are cached too) if the frontmatter is
+    missing or invalid. The returned dict is shared and must not be modified.
+    """
+    path = os.path.abspath(skill_md)
+    stat = os.stat(path)
+    cached = _frontmatter_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        result = cached[2]
+    else:
+        result = _parse_frontmatter(path)
+        _frontmatter_cache[path] = (stat.st_mtime_ns, stat.st_size, result)
+
+    if isinstance(result, str):
+        raise FrontmatterError(result)
+    return result
+
+
+def _parse_frontmatter(path):
+    """Parse a SKILL.md frontmatter, returning the dict or an error message"""
     try:
-        frontmatter = yaml.safe_load(frontmatter_text)
-        if not isinstance(frontmatter, dict):
-            return False, "Frontmatter must be a YAML dictionary"
+        frontmatter_text = read_frontmatter(path)
+    except FrontmatterError as e:
+        return str(e)
+
+    yaml, loader = _yaml()
+    try:
+        frontmatter = yaml.load(frontmatter_text, Loader=loader)
     except yaml.YAMLError as e:
-        return False, f"Invalid YAML in frontmatter: {e}"
+        return f"Invalid YAML in frontmatter: {e}"
+    if not isinstance(frontmatter, dict):
+        return "Frontmatter must be a YAML dictionary"
+    return frontmatter
+
+
+def collect_errors(skill_path):
+    """Validate a skill and return every problem found (empty list if valid)"""
+    skill_path = Path(skill_path)
+
+    # Check SKILL.md exists
+    skill_md = skill_path / 'SKILL.md'
+    if not skill_md.exists():
+        return ["SKILL.md not found"]
+
+    # Read and parse only the frontmatter block, not the body after it
+    try:
+        frontmatter = load_frontmatter(skill_md)
+    except FrontmatterError as e:
+        return [str(e)]
 
-    # Define allowed properties
-    ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata'}
+    errors = []
 
     # Check for unexpected properties (excluding nested keys under metadata)
     unexpected_keys = set(frontmatter.keys()) - ALLOWED_PROPERTIES
     if unexpected_keys:
-        return False, (
+        errors.append(
             f"Unexpected key(s) in SKILL.md frontmatter: {', '.join(sorted(unexpected_keys))}. "
             f"Allowed properties are: {', '.join(sorted(ALLOWED_PROPERTIES))}"
         )
 
     # Check required fields
     if 'name' not in frontmatter:
-        return False, "Missing 'name' in frontmatter"
+        errors.append("Missing 'name' in frontmatter")
     if 'description' not in frontmatter:
-        return False, "Missing 'description' in frontmatter"
+        errors.append("Missing 'description' in frontmatter")
 
     # Extract name for validation
     name = frontmatter.get('name', '')
     if not isinstance(name, str):
-        return False, f"Name must be a string, got {type(name).__name__}"
-    name = name.strip()
-    if name:
+        errors.append(f"Name must be a string, got {type(name).__name__}")
+    elif name.strip():
+        name = name.strip()
         # Check naming convention (hyphen-case: lowercase with hyphens)
         if not re.match(r'^[a-z0-9-]+$', name):
-            return False, f"Name '{name}' should be hyphen-case (lowercase letters, digits, and hyphens only)"
-        if name.startswith('-') or name.endswith('-') or '--' in name:
-            return False, f"Name '{name}' cannot start/end with hyphen or contain consecutive hyphens"
+            errors.append(f"Name '{name}' should be hyphen-case (lowercase letters, digits, and hyphens only)")
+        elif name.startswith('-') or name.endswith('-') or '--' in name:
+            errors.append(f"Name '{name}' cannot start/end with hyphen or contain consecutive hyphens")
         # Check name length (max 64 characters per spec)
         if len(name) > 64:
-            return False, f"Name is too long ({len(name)} characters). Maximum is 64 characters."
+            errors.append(f"Name is too long ({len(name)} characters). Maximum is 64 characters.")
 
     # Extract and validate description
     description = frontmatter.get('description', '')
     if not isinstance(description, str):
-        return False, f"Description must be a string, got {type(description).__name__}"
-    description = description.strip()
-    if description:
+        errors.append(f"Description must be a string, got {type(description).__name__}")
+    elif description.strip():
+        description = description.strip()
         # Check for angle brackets
         if '<' in description or '>' in description:
-            return False, "Description cannot contain angle brackets (< or >)"
+            errors.append("Description cannot contain angle brackets (< or >)")
         # Check description length (max 1024 characters per spec)
         if len(description) > 1024:
-            return False, f"Description is too long ({len(description)} characters). Maximum is 1024 characters."
+            errors.append(f"Description is too long ({len(description)} characters). Maximum is 1024 characters.")
 
+    return errors
+
+
+def validate_skill(skill_path):
+    """Basic validation of a skill"""
+    errors = collect_errors(skill_path)
+    if errors:
+        return False, errors[0]
     return True, "Skill is valid!"
 
-if __name__ == "__main__":
+
+def find_skills(root):
+    """Yield every directory under root that contains a SKILL.md, in sorted order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.'))
+        if 'SKILL.md' in filenames:
+            yield Path(dirpath)
+
+
+def _validate_one(skill_path):
+    return collect_errors(skill_path)
+
+
+def validate_all(root, jobs=None):
+    """
+    Validate every skill under root, in parallel when there are many.
+
+    Returns a summary dict with per-skill errors; paths are relative to root.
+    """
+    root = Path(root)
+    skills = list(find_skills(root))
+    jobs = jobs or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if jobs > 1 and len(skills) >= PARALLEL_THRESHOLD:
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(skills) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            outcomes = list(executor.map(_validate_one, skills, chunksize=chunksize))
+    else:
+        outcomes = [_validate_one(skill) for skill in skills]
+    elapsed = time.perf_counter() - start
+
+    results = [
+        {
+            'skill': skill.relative_to(root).as_posix() or '.',
+            'valid': not errors,
+            'errors': errors,
+        }
+        for skill, errors in zip(skills, outcomes)
+    ]
+    invalid = sum(1 for result in results if not result['valid'])
+    return {
+        'root': str(root),
+        'total': len(results),
+        'valid': len(results) - invalid,
+        'invalid': invalid,
+        'elapsed_seconds': round(elapsed, 4),
+        'skills': results,
+    }
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == 'validate_all':
+        parser = argparse.ArgumentParser(
+            prog='quick_validate.py validate_all',
+            description='Validate every skill under a directory and print a JSON summary',
+        )
+        parser.add_argument('root', help='Directory to search for SKILL.md files')
+        parser.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+        args = parser.parse_args(sys.argv[2:])
+
+        if not Path(args.root).is_dir():
+            print(f"Not a directory: {args.root}")
+            sys.exit(1)
+
+        summary = validate_all(args.root, args.jobs)
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        sys.exit(0 if summary['invalid'] == 0 else 1)
+
     if len(sys.argv) != 2:
         print("Usage: python quick_validate.py <skill_directory>")
+        print("       python quick_validate.py validate_all <root> [--jobs N]")
         sys.exit(1)
-    
+
     valid, message = validate_skill(sys.argv[1])
     print(message)
-    sys.exit(0 if valid else 1)
\ No newline at end of file
+    sys.exit(0 if valid else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Tests for reusing compressed members when a skill is repackaged."""
+
+import struct
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import package_skill  # noqa: E402
+
+
+def write_skill(skill_dir):
+    skill_dir.mkdir()
+    (skill_dir / "SKILL.md").write_text(
+        "---\nname: demo-skill\ndescription: Skill used by the packaging tests\n---\n\n# Demo\n"
+    )
+    (skill_dir / "reference.md").write_text("Unchanged reference material.\n" * 200)
+    (skill_dir / "notes.md").write_text("First draft.\n")
+
+
+def compressed_bytes(archive, arcname):
+    """Return (CRC, raw compressed bytes) of a member, read from its local header"""
+    with zipfile.ZipFile(archive) as zipf:
+        info = zipf.getinfo(arcname)
+    with open(archive, "rb") as f:
+        f.seek(info.header_offset)
+        header = struct.unpack("<4s5H3L2H", f.read(30))
+        f.seek(header[-2] + header[-1], 1)
+        return info.CRC, f.read(info.compress_size)
+
+
+@pytest.mark.parametrize("raw_copy", [True, False])
+def test_unchanged_member_keeps_crc_and_compressed_bytes(tmp_path, monkeypatch, raw_copy):
+    monkeypatch.setattr(package_skill, "_RAW_COPY", raw_copy and package_skill._RAW_COPY)
+    skill_dir = tmp_path / "demo-skill"
+    write_skill(skill_dir)
+    dist = tmp_path / "dist"
+
+    first = package_skill.package_skill(skill_dir, dist, verbose=False)
+    before = compressed_bytes(first.path, "demo-skill/reference.md")
+
+    (skill_dir / "notes.md").write_text("Second draft.\n")
+    second = package_skill.package_skill(skill_dir, dist, verbose=False)
+    assert second.status == "built"
+    assert compressed_bytes(second.path, "demo-skill/reference.md") == before
+
+    with zipfile.ZipFile(second.path) as zipf:
+        assert zipf.testzip() is None
+        assert zipf.read("demo-skill/notes.md") == b"Second draft.\n"
+
+    # The result is the same archive a clean build produces
+    rebuilt = tmp_path / "rebuilt"
+    clean = package_skill.package_skill(skill_dir, rebuilt, verbose=False)
+    assert clean.path.read_bytes() == second.path.read_bytes()